@@ -1,5 +1,13 @@
+from datetime import datetime
+
 import streamlit as st
-import pandas as pd
+
+from fcr import kpi
+from fcr.data import (
+    SHEET_GIDS, TIME_SERIES, load_changes, load_latest, load_ranking,
+    load_sheet, load_sheets, pick_as_of_day, show_freshness,
+)
+from fcr.tehsils import TEHSILS
 
 
 st.set_page_config(
@@ -11,24 +19,33 @@ st.title("📊 FCR Daily Dashboard")
 st.markdown("---")
 
 
+# ====================================================
+# LOAD ALL SHEETS (PARALLEL)
+# ====================================================
+
+# None for today; a past day is rebuilt from the sheet history
+as_of_day = pick_as_of_day()
+
+try:
+    if as_of_day is None:
+        sheets = load_sheets()
+    else:
+        sheets = {name: load_sheet(name, as_of_day) for name in SHEET_GIDS}
+except (RuntimeError, LookupError) as exc:
+    st.error(str(exc))
+    st.stop()
+
+if as_of_day is None:
+    show_freshness()
+else:
+    st.caption(f"Dashboard as it stood on {as_of_day:%d-%m-%Y}")
+
 # ====================================================
 # TEHSIL FILTER
 # ====================================================
 
-tehsil_list = [
-    "ASR I",
-    "Jandiala Guru",
-    "ASR II",
-    "Attari",
-    "Ajnala",
-    "Ramdass",
-    "Baba Bakala Sahib",
-    "Tarsikka",
-    "Beas",
-    "Lopoke",
-    "Rajasansi",
-    "Majitha"
-]
+# The district's canonical tehsils; unknown names never count by default
+tehsil_list = list(TEHSILS)
 
 selected_tehsils = st.sidebar.multiselect(
     "Select Tehsil",
@@ -40,138 +57,27 @@ no_tehsil_selected = len(selected_tehsils) == 0
 
 if no_tehsil_selected:
     st.warning("Please select at least one Tehsil")
-# ====================================================
-# LOAD MUTATION
-# ====================================================
-
-@st.cache_data(ttl=300)
-def load_mutation():
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=2073381520"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-    return df
-
-mutation_df = load_mutation()
-
-if "tehsil" in mutation_df.columns:
-    mutation_df = mutation_df[mutation_df["tehsil"].isin(selected_tehsils)]
-
-mutation_pending = int(
-    mutation_df["grand_total_of_mutation_pendency_beyond_30_days"].sum()
-)
 
 # ====================================================
-# LOAD MUSAVI
+# KPIs (ONE PASS PER SHEET)
 # ====================================================
 
-@st.cache_data(ttl=300)
-def load_musavi():
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=1163442311"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
-    return df
-
-musavi_df = load_musavi()
+# Daily sheets are snapshots: count each tehsil's latest day, not the history
+current = {name: load_latest(name, as_of_day) for name in TIME_SERIES}
 
-if "Tehsil / Sub-Tehsil" in musavi_df.columns:
-    musavi_df = musavi_df[musavi_df["Tehsil / Sub-Tehsil"].isin(selected_tehsils)]
+kpis = kpi.compute_all({**sheets, **current}, selected_tehsils)
 
-musavi_pending = int(
-    musavi_df["Pending at Patwari"].sum()
-    + musavi_df["Pending at CRO"].sum()
-    + musavi_df["Pending at RPSC"].sum()
-)
-
-# ====================================================
-# LOAD BHUNAKSHA
-# ====================================================
-
-@st.cache_data(ttl=300)
-def load_bhunaksha():
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=741935264"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
-    return df
-
-bhunaksha_df = load_bhunaksha()
-
-if "Name of Tehsil/Sub Tehsil" in bhunaksha_df.columns:
-    bhunaksha_df = bhunaksha_df[
-        bhunaksha_df["Name of Tehsil/Sub Tehsil"].isin(selected_tehsils)
-    ]
-
-bhunaksha = {
-    "shapefiles": int(bhunaksha_df["No. of Villages of which Shapefiles available with Districts"].sum()),
-    "initiated": int(bhunaksha_df["Total no. of villages where tatima incorporation work has been initiated"].sum()),
-    "incorporated": int(bhunaksha_df["Total no. of Tatimas incorporated"].sum()),
-    "pending": int(bhunaksha_df["Tatima incorporation Pending at Patwari level"].sum()),
-    "completed": int(bhunaksha_df["No. of villages where Tatima work has been completed"].sum()),
-}
-
-# ====================================================
-# LOAD DIGITAL CROP
-# ====================================================
-
-@st.cache_data(ttl=300)
-def load_crop():
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=30899428"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
-    return df
-
-crop_df = load_crop()
-
-if "Tehsil" in crop_df.columns:
-    crop_df = crop_df[crop_df["Tehsil"].isin(selected_tehsils)]
-
-elif "Tehsil / Sub-Tehsil" in crop_df.columns:
-    crop_df = crop_df[crop_df["Tehsil / Sub-Tehsil"].isin(selected_tehsils)]
-
-crop = {
-    "villages": int(crop_df["Total no. of villages"].sum()),
-    "total_plots": int(crop_df["Total number of uploaded plots"].sum()),
-    "surveyed": int(crop_df["Number of completed Plots till date"].sum()),
-    "pending": int(crop_df["Pending for survey"].sum()),
-    "surveyors": int(crop_df["Number of Pvt. Surveyors identified"].sum()),
-}
-
-# ====================================================
-# LOAD SVAMITWA
-# ====================================================
-
-@st.cache_data(ttl=300)
-def load_svamitwa():
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=1518724049"
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
-    return df
-
-svamitwa_df = load_svamitwa()
-
-if "Name of Tehsil" in svamitwa_df.columns:
-    svamitwa_df = svamitwa_df[
-        svamitwa_df["Name of Tehsil"].isin(selected_tehsils)
-    ]
-
-numeric_cols = svamitwa_df.select_dtypes(include="number").columns
-sv = svamitwa_df[numeric_cols].sum()
+mutation = kpis["mutation"]
+musavi = kpis["musavi"]
+bhunaksha = kpis["bhunaksha"]
+crop = kpis["crop"]
+sv = kpis["svamitwa"]
 
 # ====================================================
 # TOTAL DISTRICT PENDENCY
 # ====================================================
 
-if no_tehsil_selected:
-
-    total_pendency = 0
-
-else:
-
-    total_pendency = (
-        mutation_pending
-        + musavi_pending
-        + bhunaksha["pending"]
-        + crop["pending"]
-    )
+total_pendency = kpi.total_pendency(kpis)
 
 # ====================================================
 # TOP KPI
@@ -185,108 +91,68 @@ c2.metric("Total Sub Divisions", len(selected_tehsils))
 st.markdown("---")
 
 # ====================================================
-# MUTATION SUMMARY
+# WHAT CHANGED SINCE THE LAST REFRESH
 # ====================================================
 
-st.subheader("Mutation Summary")
-
-m1, m2, m3, m4 = st.columns(4)
-
-m1.metric("Patwari >30 Days",
-          int(mutation_df["pendency_at_patwari_level_beyond_30_days"].sum()))
-
-m2.metric("Kanungo >30 Days",
-          int(mutation_df["pendency_at_kanungo_level_beyond_30_days"].sum()))
-
-m3.metric("CRO >30 Days",
-          int(mutation_df["pendency_at_cro_level_beyond_30_days"].sum()))
-
-m4.metric("Total Mutation Pending", mutation_pending)
-
-st.markdown("---")
-
-# ====================================================
-# MUSAVI SUMMARY
-# ====================================================
+SHEET_TITLES = {
+    "mutation": "Mutation",
+    "musavi": "Musavi",
+    "bhunaksha": "Bhunaksha",
+    "crop": "Digital Crop",
+    "svamitwa": "Svamitwa",
+}
 
-st.subheader("Musavi Summary")
+if as_of_day is None:
 
-c1, c2, c3, c4 = st.columns(4)
+    # Diffed once per refresh (see fcr.changes); sessions only filter
+    feeds = [load_changes(name) for name in SHEET_GIDS]
+    feeds = [f for f in feeds if f is not None and not f.empty]
 
-c1.metric("Total Villages", int(musavi_df["Total Villages"].sum()))
-c2.metric("Maps Received", int(musavi_df["Maps Received"].sum()))
-c3.metric("Maps Validated", int(musavi_df["Maps Validated"].sum()))
-c4.metric("Total Pending", musavi_pending)
+    with st.expander("🔄 What changed since the last refresh", expanded=bool(feeds)):
 
-st.markdown("---")
+        if not feeds:
+            st.write("No changes since the last refresh.")
 
-# ====================================================
-# BHUNAKSHA SUMMARY
-# ====================================================
+        for feed in feeds:
 
-st.subheader("Bhunaksha Summary")
+            st.markdown(f"**{SHEET_TITLES[feed.sheet]}** · updated "
+                        f"{datetime.fromtimestamp(feed.at):%d-%m-%Y %H:%M}")
+            st.caption(
+                f"{len(feed.new_rows)} new rows · {len(feed.cells)} changed cells · "
+                f"{len(feed.removed_rows)} removed rows"
+            )
 
-b1, b2, b3, b4, b5 = st.columns(5)
+            deltas = feed.kpi_deltas[feed.kpi_deltas["Tehsil"].isin(selected_tehsils)]
+            if not deltas.empty:
+                st.dataframe(deltas, hide_index=True, use_container_width=True)
 
-b1.metric("Shapefile Villages", bhunaksha["shapefiles"])
-b2.metric("Villages Initiated", bhunaksha["initiated"])
-b3.metric("Tatima Incorporated", bhunaksha["incorporated"])
-b4.metric("Pending", bhunaksha["pending"])
-b5.metric("Villages Completed", bhunaksha["completed"])
+            cells = feed.cells[feed.cells["Tehsil"].isin(selected_tehsils)]
+            if not cells.empty:
+                st.dataframe(cells, hide_index=True, use_container_width=True)
 
-st.markdown("---")
+    st.markdown("---")
 
 # ====================================================
-# DIGITAL CROP
-# ====================================================
+# SCHEME SUMMARIES
 # ====================================================
-# DIGITAL CROP
-# ====================================================
-
-@st.cache_data(ttl=300)
-def load_crop():
-
-    url = "https://docs.google.com/spreadsheets/d/135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY/export?format=csv&gid=30899428"
 
-    df = pd.read_csv(url)
-    df.columns = df.columns.str.strip()
+for title, result in [
+    ("Mutation Summary", mutation),
+    ("Musavi Summary", musavi),
+    ("Bhunaksha Summary", bhunaksha),
+    ("Digital Crop Summary", crop),
+    ("Svamitwa Summary", sv),
+]:
 
-    return df
+    st.subheader(title)
 
+    items = result.items()
+    cols = st.columns(len(items))
 
-crop_df = load_crop()
+    for col, (label, value) in zip(cols, items):
+        col.metric(label, value)
 
-if no_tehsil_selected:
-
-    crop = {
-        "villages": 0,
-        "total_plots": 0,
-        "surveyed": 0,
-        "pending": 0,
-        "surveyors": 0,
-    }
-
-else:
-
-    crop = {
-        "villages": int(crop_df["Total no. of villages"].sum()),
-        "total_plots": int(crop_df["Total number of uploaded plots"].sum()),
-        "surveyed": int(crop_df["Number of completed Plots till date"].sum()),
-        "pending": int(crop_df["Pending for survey"].sum()),
-        "surveyors": int(crop_df["Number of Pvt. Surveyors identified"].sum()),
-    }
-# ====================================================
-# SVAMITWA SUMMARY
-# ====================================================
-
-st.subheader("Svamitwa Summary")
-
-cols = st.columns(4)
-
-for i, col in enumerate(sv.index[:4]):
-    cols[i].metric(col.replace("_", " "), int(sv[col]))
-
-st.markdown("---")
+    st.markdown("---")
 
 st.caption("FCR Monitoring Dashboard")
 st.caption("Prepared by Tanish Singhal")
@@ -304,8 +170,8 @@ st.caption("Prepared by Tanish Singhal")
 # ==============================
 
 pendency_summary = {
-    "Mutation Pending": mutation_pending,
-    "Musavi Pending": musavi_pending,
+    "Mutation Pending": mutation["pending"],
+    "Musavi Pending": musavi["pending"],
     "Bhunaksha Pending": bhunaksha["pending"],
     "Digital Crop Pending": crop["pending"]
 }
@@ -317,35 +183,33 @@ total_all = sum(pendency_summary.values())
 # TOP 3 SUB DIVISIONS + CRITICAL ISSUES
 # ==============================
 
-st.subheader("📊 Top 3 Sub Divisions by Pendency")
+# Cross-scheme pendency score per tehsil, built once per data refresh
+ranking = load_ranking(as_of_day)
 
-col_left, col_right = st.columns([2,1])
 
-with col_left:
+def show_ranked(rows, caption):
 
-    sub_data = {
-        "ASR I": 120,
-        "Jandiala Guru": 90,
-        "ASR II": 60
-    }
+    for row in rows.to_dict("records"):
 
-    sub_summary = pd.DataFrame(
-        list(sub_data.items()),
-        columns=["Sub Division","Total"]
-    )
+        st.markdown(f"### {row['Tehsil']}")
+        st.write(f"**{row['Score']:.1f}** ({caption})")
+        st.caption(
+            f"Mutation {int(row['mutation'])} · Musavi {int(row['musavi'])} · "
+            f"Bhunaksha {int(row['bhunaksha'])} · Digital Crop {int(row['crop'])}"
+        )
+        st.progress(min(row["Score"] / 100, 1.0))
 
-    total_sum = sub_summary["Total"].sum()
 
-    for _, row in sub_summary.iterrows():
+st.subheader("📊 Top 3 Sub Divisions (Lowest Pendency)")
 
-        name = row["Sub Division"]
-        value = row["Total"]
+col_left, col_right = st.columns([2,1])
 
-        percent = (value / total_sum * 100)
+with col_left:
 
-        st.markdown(f"### {name}")
-        st.write(f"**{value}** ({percent:.1f}% of total)")
-        st.progress(percent/100)
+    show_ranked(
+        ranking.bottom(3, selected_tehsils),
+        "average % of district pendency across schemes"
+    )
 with col_right:
 
     st.subheader("🔥 Critical Issues")
@@ -353,9 +217,6 @@ with col_right:
     top_issue = max(pendency_summary, key=pendency_summary.get)
     top_issue_value = pendency_summary[top_issue]
 
-    highest_sub = sub_summary.iloc[0]["Sub Division"]
-    highest_value = sub_summary.iloc[0]["Total"]
-
     st.markdown("### Top Issue:")
     st.write(top_issue)
 
@@ -364,12 +225,6 @@ with col_right:
     if total_all > 0:
         st.caption(f"{(top_issue_value/total_all*100):.1f}% of total")
 
-    # st.markdown("---")
-
-    # st.markdown("### Highest Alert:")
-    #st.write(highest_sub)
-
-    #st.markdown(f"## {highest_value}")
 st.markdown("---")
 
 # ==============================
@@ -378,31 +233,9 @@ st.markdown("---")
 
 st.subheader("⚠️ Worst 3 Sub Divisions by Pendency")
 
-# Group data by Sub Division
-sub_summary = (
-    mutation_df
-    .groupby("tehsil")["grand_total_of_mutation_pendency_beyond_30_days"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(3)
-    .reset_index()
+show_ranked(
+    ranking.top(3, selected_tehsils),
+    "average % of district pendency across schemes"
 )
 
-total_sum = sub_summary["grand_total_of_mutation_pendency_beyond_30_days"].sum()
-
-for _, row in sub_summary.iterrows():
-
-    name = row["tehsil"]
-    value = row["grand_total_of_mutation_pendency_beyond_30_days"]
-
-    percent = (value / total_sum * 100) if total_sum > 0 else 0
-
-    st.markdown(f"### {name}")
-    st.write(f"**{int(value)}** ({percent:.1f}% of worst pendency)")
-
-    st.progress(percent/100)
-
-    st.markdown("")
-
 st.markdown("---")
-
@@ -0,0 +1 @@
+"""Data layer shared by the FCR dashboard pages."""
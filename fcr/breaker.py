@@ -0,0 +1,68 @@
+"""Circuit breaker for the export upstream.
+
+After ``threshold`` fetches in a row have failed, the breaker opens and
+further fetches fail at once with ``CircuitOpen`` instead of waiting on
+timeouts and retries against a server that is down. Once the cool-down
+has passed one trial fetch is let through: success closes the breaker,
+failure opens it again for twice as long, up to ``max_cooldown``.
+
+Only errors that ``is_failure`` accepts count against the upstream. Any
+other error (a missing tab, a 404 for one gid) means the upstream answered,
+so it counts as a success and cannot lock the other sheets out.
+"""
+
+import threading
+import time
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold=3, cooldown=30, max_cooldown=600, is_failure=None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.is_failure = is_failure or (lambda exc: True)
+        self._failures = 0
+        self._open_until = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._failures >= self.threshold and time.monotonic() < self._open_until
+
+    def _admit(self):
+        with self._lock:
+            if self._failures < self.threshold:
+                return
+            if time.monotonic() < self._open_until or self._trial:
+                raise CircuitOpen(
+                    f"Upstream failed {self._failures} times in a row; "
+                    f"not retrying for {max(0, self._open_until - time.monotonic()):.0f}s"
+                )
+            self._trial = True   # half-open: one fetch finds out
+
+    def _record(self, ok):
+        with self._lock:
+            self._trial = False
+            if ok:
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._failures >= self.threshold:
+                backoff = self.cooldown * 2 ** (self._failures - self.threshold)
+                self._open_until = time.monotonic() + min(backoff, self.max_cooldown)
+
+    def call(self, fn, *args, **kwargs):
+        self._admit()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._record(ok=not self.is_failure(exc))
+            raise
+        self._record(ok=True)
+        return result
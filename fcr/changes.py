@@ -0,0 +1,165 @@
+"""What changed between two consecutive exports of a sheet.
+
+Rows are keyed by (tehsil, date), numbered in order where a key repeats,
+and hashed whole, so two exports are compared with one hash per row and
+index set operations. Only the rows whose hash moved are compared cell by
+cell. The result is a small ``ChangeFeed``, built once per refresh by the
+process that fetched the export and saved next to its snapshot, so every
+session and every replica reads the same feed. An export that only added
+rows at the bottom needs no diff at all: ``appended`` builds its feed from
+the new rows and the latest day of the tehsils they report.
+"""
+
+import io
+import json
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ChangeFeed:
+    sheet: str
+    since: float                # fetch time of the previous export
+    at: float                   # fetch time of this export
+    new_rows: pd.DataFrame      # keys of rows the previous export lacked
+    removed_rows: pd.DataFrame  # keys of rows this export dropped
+    cells: pd.DataFrame         # keys, Column, Old, New for every edited cell
+    kpi_deltas: pd.DataFrame    # Tehsil, then new - old per KPI label; moved tehsils only
+
+    @property
+    def empty(self):
+        return self.new_rows.empty and self.removed_rows.empty and self.cells.empty
+
+    def to_json(self):
+        frames = ("new_rows", "removed_rows", "cells", "kpi_deltas")
+        return json.dumps({
+            "sheet": self.sheet,
+            "since": self.since,
+            "at": self.at,
+            **{f: getattr(self, f).to_json(orient="table", index=False) for f in frames},
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        for name in ("new_rows", "removed_rows", "cells", "kpi_deltas"):
+            data[name] = pd.read_json(io.StringIO(data[name]), orient="table")
+        return cls(**data)
+
+
+def _keys(df, keys):
+    """Row keys as a unique MultiIndex: key columns plus occurrence number."""
+    parts = [df["Tehsil"].astype(str)] + [df[k] for k in keys[1:]]
+    occurrence = df.groupby(parts, observed=True, sort=False).cumcount()
+    return pd.MultiIndex.from_arrays(parts + [occurrence], names=keys + ["#"])
+
+
+def _key_frame(index):
+    return index.to_frame(index=False).drop(columns="#")
+
+
+def _text(values):
+    return np.where(pd.isna(values), "", values.astype(str)).astype(object)
+
+
+def _per_tehsil(df, kpis, date):
+    if date is not None and len(df):
+        # Daily sheets count each tehsil's latest day, as on the home page
+        df = df[df[date] == df.groupby("Tehsil", observed=True)[date].transform("max")]
+
+    columns = list(dict.fromkeys(c for k in kpis for c in k.columns if c in df.columns))
+    sums = df.groupby(df["Tehsil"].astype(str))[columns].sum()
+    return pd.DataFrame({
+        k.label: sums[[c for c in k.columns if c in sums.columns]].sum(axis=1)
+        for k in kpis
+    })
+
+
+def _deltas(old, new, kpis, date):
+    deltas = _per_tehsil(new, kpis, date).sub(_per_tehsil(old, kpis, date), fill_value=0)
+    return deltas[(deltas != 0).any(axis=1)].rename_axis("Tehsil").reset_index()
+
+
+def compare(sheet, old, new, columns, date=None, kpis=(), since=None, at=None):
+    """Diff two cleaned exports of a sheet over ``columns``."""
+    keys = ["Tehsil"] + ([date] if date is not None else [])
+    columns = [c for c in columns if c in old.columns and c in new.columns and c not in keys]
+
+    old_keys, new_keys = _keys(old, keys), _keys(new, keys)
+    old_hash = pd.Series(
+        pd.util.hash_pandas_object(old[columns], index=False).to_numpy(), index=old_keys
+    )
+    new_hash = pd.util.hash_pandas_object(new[columns], index=False).to_numpy()
+
+    added = ~new_keys.isin(old_keys)
+    removed = ~old_keys.isin(new_keys)
+
+    common = new_keys[~added]
+    changed = common[old_hash.reindex(common).to_numpy() != new_hash[~added]]
+
+    before = old[columns].set_axis(old_keys).loc[changed].to_numpy(object)
+    after = new[columns].set_axis(new_keys).loc[changed].to_numpy(object)
+    differs = (before != after) & ~(pd.isna(before) & pd.isna(after))
+    rows, cols = np.nonzero(differs)
+
+    # Old and New hold values of every column, so they are kept as text:
+    # one type per column is what Arrow (and st.dataframe) need
+    cells = _key_frame(changed[rows]).assign(
+        Column=np.asarray(columns, dtype=object)[cols],
+        Old=_text(before[rows, cols]),
+        New=_text(after[rows, cols]),
+    )
+
+    return ChangeFeed(
+        sheet=sheet,
+        since=since,
+        at=at,
+        new_rows=_key_frame(new_keys[added]),
+        removed_rows=_key_frame(old_keys[removed]),
+        cells=cells,
+        kpi_deltas=_deltas(old, new, kpis, date),
+    )
+
+
+def _latest_rows(df, tehsils, date):
+    """Rows of the date-sorted ``df`` on the latest day of each of ``tehsils``.
+
+    Read from the bottom in doubling blocks, until every tehsil has turned
+    up and the block reaches back past its latest day. Tehsils that report
+    every day are all found within the last few days.
+    """
+    tail, start, block = df.iloc[:0], len(df), 256
+    while start > 0:
+        start = max(0, start - block)
+        block *= 2
+        tail = df.iloc[start:]
+        tail = tail[tail["Tehsil"].isin(tehsils)]
+        latest = tail.groupby("Tehsil", observed=True)[date].max()
+        if len(latest) == len(tehsils) and df[date].iloc[start] < latest.min():
+            break
+    return tail
+
+
+def appended(sheet, old, new, date, kpis=(), since=None, at=None):
+    """Feed of an export that is the date-sorted ``old`` with rows added.
+
+    Only the new rows are read, plus the latest day of the tehsils they
+    report, so the cost follows the append rather than the sheet.
+    """
+    rows = new.iloc[len(old):]
+    tehsils = rows["Tehsil"].unique()
+    keys = rows[["Tehsil", date]].astype({"Tehsil": str}).reset_index(drop=True)
+
+    return ChangeFeed(
+        sheet=sheet,
+        since=since,
+        at=at,
+        new_rows=keys,
+        removed_rows=keys.iloc[:0],
+        cells=keys.iloc[:0].assign(Column="", Old="", New=""),
+        kpi_deltas=_deltas(
+            _latest_rows(old, tehsils, date), _latest_rows(new, tehsils, date), kpis, date
+        ),
+    )
@@ -0,0 +1,102 @@
+"""Shared HTTP client for sheet exports.
+
+One pooled ``requests`` session serves every fetch in the process, so a
+refresh reuses kept-alive connections (and their TLS sessions) instead of
+opening one per gid. Responses are negotiated as gzip/deflate and arrive
+decoded as one ``bytes`` object, which goes to the parser as is.
+
+At most ``MAX_CONNECTIONS`` requests are in flight at once. Connection
+errors, timeouts and 429/5xx answers are retried with exponential,
+jittered backoff, so replicas that failed together do not retry together.
+Jitter needs urllib3 2; with urllib3 1.x the backoff is plain exponential.
+"""
+
+import inspect
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Requests in flight at once, across all sheets
+MAX_CONNECTIONS = 8
+
+# Seconds to open a connection, and between bytes of a response
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 20
+
+# Attempts after the first, and the base of the backoff in seconds
+RETRIES = 3
+BACKOFF = 0.5
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_JITTER = "backoff_jitter" in inspect.signature(Retry).parameters
+
+
+class Client:
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, retries=RETRIES, backoff=BACKOFF):
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+            **({"backoff_jitter": backoff} if _JITTER else {}),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max_connections,
+            pool_block=True,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+        self.timeout = (connect_timeout, read_timeout)
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def get(self, url, headers=None):
+        """GET ``url``; the body is read in full before the slot is freed."""
+        with self._slots:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            resp.content
+        return resp
+
+    def close(self):
+        self.session.close()
+
+
+def is_outage(exc):
+    """Whether a failed fetch says the upstream is down or overloaded.
+
+    Connection errors, timeouts and 429/5xx answers do; a 4xx answer only
+    says that one request was wrong.
+    """
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in RETRY_STATUSES
+    return isinstance(exc, (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.RetryError,
+    ))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default():
+    """The process-wide client, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Client()
+        return _default
@@ -0,0 +1,125 @@
+"""Long daily fact table for the Digital Crop sheet.
+
+The Digital Crop tab is wide: every survey day adds a "Plots surveyed on
+DD-MM-YYYY" and a "Surveyors on field" column. ``daily_facts`` turns those
+columns into one row per (date, tehsil) once per export, so the page never
+has to melt the sheet or parse header dates on a rerun.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from fcr import frames
+
+
+SURVEYED = "Plots surveyed on "
+SURVEYORS = "Surveyors on field"
+
+_HEADER_DATE = re.compile(r"(\d{1,2}-\d{1,2}-\d{4})")
+
+FACT_COLUMNS = ["Date", "tehsil_id", "Tehsil", "Plots Surveyed", "Surveyors on Field"]
+
+# Columns add_dashboard_fields derives from the sheet's own columns
+DASHBOARD_FIELDS = [
+    "Survey Completion", "Approval Rate", "Total Plots", "Surveyed Plots",
+    "Surveyors", "Survey Progress", "Daily Progress", "Surveyors In Field", "In Field",
+]
+
+
+def _header_date(column):
+    found = _HEADER_DATE.search(column)
+    if found is None:
+        return pd.NaT
+    return pd.to_datetime(found.group(1), format="%d-%m-%Y", errors="coerce")
+
+
+def day_columns(columns):
+    """Map each survey date to its (plots surveyed, surveyors) columns.
+
+    Surveyor headers that carry no date are paired with the plot columns
+    in sheet order, aligned on the most recent day.
+    """
+    surveyed = [c for c in columns if c.startswith(SURVEYED)]
+    surveyors = [c for c in columns if c.startswith(SURVEYORS)]
+
+    dates = [_header_date(c) for c in surveyed]
+    days = {d: [c, None] for d, c in zip(dates, surveyed) if not pd.isna(d)}
+
+    dated = {_header_date(c): c for c in surveyors}
+    undated = [c for c in surveyors if pd.isna(_header_date(c))]
+    for date, column in dated.items():
+        if date in days:
+            days[date][1] = column
+    for date, column in zip(reversed(dates), reversed(undated)):
+        if date in days and days[date][1] is None:
+            days[date][1] = column
+
+    return {date: tuple(days[date]) for date in sorted(days)}
+
+
+def daily_facts(df):
+    """One row per (date, tehsil), sorted by date then tehsil id."""
+    days = day_columns(df.columns)
+    if not days:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+
+    n_days, n_rows = len(days), len(df)
+    zeros = np.zeros(n_rows, dtype=np.int32)
+
+    # Day-major blocks of rows, so the result is already date-sorted
+    plots = np.concatenate([df[p].to_numpy(np.int32) for p, _ in days.values()])
+    field = np.concatenate([
+        df[s].to_numpy(np.int32) if s is not None else zeros
+        for _, s in days.values()
+    ])
+
+    facts = pd.DataFrame({
+        "Date": np.repeat(pd.DatetimeIndex(list(days)).values, n_rows),
+        "tehsil_id": np.tile(df["tehsil_id"].to_numpy(), n_days),
+        "Tehsil": pd.Categorical.from_codes(
+            np.tile(df["Tehsil"].cat.codes.to_numpy(), n_days),
+            dtype=df["Tehsil"].dtype,
+        ),
+        "Plots Surveyed": plots,
+        "Surveyors on Field": field,
+    })
+
+    return frames.sort_by_date(facts)
+
+
+def merge_facts(older, newer):
+    """Fact rows from ``older`` for the days ``newer`` lacks, plus ``newer``."""
+    facts = pd.concat([older, newer], ignore_index=True)
+    facts = facts.drop_duplicates(["Date", "tehsil_id"], keep="last")
+    return frames.sort_by_date(facts)
+
+
+def add_dashboard_fields(df):
+    """Add the per-tehsil fields the Digital Crop page shows, including the
+    newest survey day's "Daily Progress" and "Surveyors In Field" (zero when
+    the sheet has no survey-day columns)."""
+    completion = (
+        df["Number of completed Plots till date"] /
+        df["Total number of uploaded plots"]
+    ) * 100
+
+    fields = {
+        "Survey Completion": completion,
+        "Approval Rate": df["Performance  in %"],
+        "Total Plots": df["Total number of uploaded plots"],
+        "Surveyed Plots": df["Number of completed Plots till date"],
+        "Surveyors": df["Number of Pvt. Surveyors identified"],
+        "Survey Progress": completion,
+    }
+
+    # Without any survey-day column nothing was reported for today; the
+    # page still gets the fields, at zero
+    days = day_columns(df.columns)
+    plots, field = days[max(days)] if days else (None, None)
+    fields["Daily Progress"] = df[plots] if plots is not None else 0
+    fields["Surveyors In Field"] = df[field] if field is not None else 0
+    fields["In Field"] = fields["Surveyors In Field"]
+
+    return df.assign(**fields)
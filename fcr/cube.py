@@ -0,0 +1,214 @@
+"""Pre-aggregated tehsil x date x metric totals for the daily sheets.
+
+A Cube is built once per refresh. It holds the sum of every numeric metric
+for each (date, tehsil) cell plus running totals along the date axis, so a
+page can answer any tehsil subset and date range by slicing and subtracting
+arrays instead of running a fresh groupby over the raw rows.
+
+Snapshot figures (pendency, villages received) must not be summed over a
+date range. ``as_of`` answers them from each tehsil's latest reported day,
+looked up in a precomputed last-row index rather than by scanning rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class Cube:
+
+    def __init__(self, dates, tehsils, metrics, values, counts):
+        self.dates = dates          # sorted DatetimeIndex, one entry per day
+        self.tehsils = tehsils      # Index of tehsil names
+        self.metrics = metrics      # Index of metric column names
+        self.values = values        # float64 [date, tehsil, metric]
+        self.counts = counts        # int64 [date, tehsil] source rows per cell
+
+        # Running totals with a leading zero slab: range sums are cum[j] - cum[i]
+        self._cum = np.zeros((len(dates) + 1, len(tehsils), len(metrics)))
+        # _last[d, t]: latest date position <= d with rows for tehsil t, or -1
+        self._last = np.full(counts.shape, -1, dtype=np.int64)
+        self._index_from(0)
+
+    def _index_from(self, start):
+        """Recompute the running totals and last-row index from date ``start`` on."""
+        np.cumsum(self.values[start:], axis=0, out=self._cum[start + 1:])
+        self._cum[start + 1:] += self._cum[start]
+
+        reported = np.where(
+            self.counts[start:] > 0, np.arange(start, len(self.dates))[:, None], -1
+        )
+        if start > 0:
+            reported[0] = np.maximum(reported[0], self._last[start - 1])
+        if len(reported):
+            np.maximum.accumulate(reported, axis=0, out=self._last[start:])
+
+    @classmethod
+    def from_frame(cls, df, date="Date", tehsil="Tehsil", metrics=None):
+        if metrics is None:
+            metrics = df.select_dtypes(include="number").columns.drop("tehsil_id", errors="ignore")
+        metrics = pd.Index(metrics)
+
+        df = df.dropna(subset=[date, tehsil])
+        tehsil_col = df[tehsil].astype("category")
+
+        dates = pd.DatetimeIndex(df[date].unique()).sort_values()
+        tehsils = pd.Index(tehsil_col.cat.categories)
+
+        d_idx = dates.get_indexer(df[date])
+        t_idx = tehsil_col.cat.codes.to_numpy()
+        flat = d_idx * len(tehsils) + t_idx
+        size = len(dates) * len(tehsils)
+
+        data = df[metrics].to_numpy(dtype="float64")
+        values = np.empty((size, len(metrics)))
+        for m in range(len(metrics)):
+            values[:, m] = np.bincount(flat, weights=data[:, m], minlength=size)
+
+        counts = np.bincount(flat, minlength=size)
+
+        return cls(
+            dates,
+            tehsils,
+            metrics,
+            values.reshape(len(dates), len(tehsils), len(metrics)),
+            counts.reshape(len(dates), len(tehsils)),
+        )
+
+    def extend(self, df, date="Date", tehsil="Tehsil"):
+        """A new cube with the rows of ``df`` added.
+
+        The rows must not predate the last date already held, so only the
+        new days' running totals are computed. They may report any subset
+        of the cube's tehsils. Returns None when they predate it, or when
+        ``df`` brings tehsils this cube has no slot for.
+        """
+        tail = Cube.from_frame(df, date, tehsil, self.metrics)
+        if len(tail.dates) == 0:
+            return self
+
+        slots = self.tehsils.get_indexer(tail.tehsils)
+        if (slots < 0).any():
+            return None
+
+        n = len(self.dates)
+        if n and tail.dates[0] < self.dates[-1]:
+            return None
+
+        # The new days, laid out on this cube's tehsil axis
+        new_values = np.zeros((len(tail.dates),) + self.values.shape[1:])
+        new_counts = np.zeros((len(tail.dates), len(self.tehsils)), dtype=self.counts.dtype)
+        new_values[:, slots] = tail.values
+        new_counts[:, slots] = tail.counts
+
+        # A first new row on the last known day lands in that day's slab
+        overlap = 1 if n and tail.dates[0] == self.dates[-1] else 0
+        start = n - overlap
+
+        values = np.concatenate([self.values, new_values[overlap:]])
+        counts = np.concatenate([self.counts, new_counts[overlap:]])
+        if overlap:
+            values[start] += new_values[0]
+            counts[start] += new_counts[0]
+
+        cube = Cube.__new__(Cube)
+        cube.dates = self.dates.append(tail.dates[overlap:])
+        cube.tehsils = self.tehsils
+        cube.metrics = self.metrics
+        cube.values = values
+        cube.counts = counts
+
+        cube._cum = np.empty((len(cube.dates) + 1,) + values.shape[1:])
+        cube._cum[:start + 1] = self._cum[:start + 1]
+        cube._last = np.empty(counts.shape, dtype=np.int64)
+        cube._last[:start] = self._last[:start]
+        cube._index_from(start)
+        return cube
+
+    # ==============================
+    # INDEX HELPERS
+    # ==============================
+
+    def _date_span(self, start=None, end=None):
+        i = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), "left")
+        j = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), "right")
+        return i, max(i, j)
+
+    def _tehsil_pos(self, tehsils=None):
+        if tehsils is None:
+            return np.arange(len(self.tehsils))
+        pos = self.tehsils.get_indexer(list(tehsils))
+        return pos[pos >= 0]
+
+    def _metric_pos(self, metrics=None):
+        if metrics is None:
+            return np.arange(len(self.metrics))
+        if isinstance(metrics, str):
+            metrics = [metrics]
+        return self.metrics.get_indexer(list(metrics))
+
+    # ==============================
+    # QUERIES
+    # ==============================
+
+    def last_date(self, tehsils=None, start=None, end=None):
+        """Latest date in the range with at least one row for the tehsils."""
+        i, j = self._date_span(start, end)
+        present = self.counts[i:j][:, self._tehsil_pos(tehsils)].any(axis=1)
+        hits = np.flatnonzero(present)
+        return self.dates[i + hits[-1]] if len(hits) else None
+
+    def by_tehsil(self, metrics=None, tehsils=None, start=None, end=None):
+        """Range totals per tehsil, one row per tehsil that has data."""
+        i, j = self._date_span(start, end)
+        t = self._tehsil_pos(tehsils)
+        m = self._metric_pos(metrics)
+
+        sums = (self._cum[j] - self._cum[i])[np.ix_(t, m)]
+        present = self.counts[i:j][:, t].any(axis=0)
+
+        out = pd.DataFrame(sums[present], columns=self.metrics[m])
+        out.insert(0, "Tehsil", self.tehsils[t][present])
+        return out
+
+    def by_date(self, metrics=None, tehsils=None, start=None, end=None):
+        """Totals over the tehsils for each date in the range that has data."""
+        i, j = self._date_span(start, end)
+        t = self._tehsil_pos(tehsils)
+        m = self._metric_pos(metrics)
+
+        sums = self.values[i:j][:, t][:, :, m].sum(axis=1)
+        present = self.counts[i:j][:, t].any(axis=1)
+
+        out = pd.DataFrame(sums[present], columns=self.metrics[m])
+        out.insert(0, "Date", self.dates[i:j][present])
+        return out
+
+    def total(self, metrics=None, tehsils=None, start=None, end=None):
+        """Grand totals over the tehsils and date range, as a Series by metric."""
+        i, j = self._date_span(start, end)
+        t = self._tehsil_pos(tehsils)
+        m = self._metric_pos(metrics)
+
+        sums = (self._cum[j] - self._cum[i])[np.ix_(t, m)].sum(axis=0)
+        return pd.Series(sums, index=self.metrics[m])
+
+    def as_of(self, metrics=None, tehsils=None, start=None, end=None):
+        """Each tehsil's values on its latest day in the range, one row per
+        tehsil that reported, with that day in the ``Date`` column."""
+        i, j = self._date_span(start, end)
+        t = self._tehsil_pos(tehsils)
+        m = self._metric_pos(metrics)
+
+        rows = self._last[j - 1, t] if j > 0 else np.full(len(t), -1)
+        keep = rows >= i
+        t, rows = t[keep], rows[keep]
+
+        out = pd.DataFrame(self.values[rows, t][:, m], columns=self.metrics[m])
+        out.insert(0, "Date", self.dates[rows])
+        out.insert(0, "Tehsil", self.tehsils[t])
+        return out
+
+    def as_of_total(self, metrics=None, tehsils=None, start=None, end=None):
+        """Sum over the tehsils of their ``as_of`` values, as a Series by metric."""
+        snapshot = self.as_of(metrics, tehsils, start, end)
+        return snapshot.drop(columns=["Tehsil", "Date"]).sum()
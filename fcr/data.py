@@ -0,0 +1,651 @@
+"""Shared loaders for the FCR Google Sheet tabs.
+
+Every page reads its sheets through this module, from whichever backend
+``FCR_SOURCE`` selects (see ``fcr.sources``). Each sheet is cleaned once
+per export and kept in a process-wide store (see ``fcr.store``), so every
+page and every session reads the same frame instead of its own copy.
+
+Fetched exports are also kept as on-disk snapshots (see ``fcr.snapshots``).
+Readers are always served the last good snapshot; a background worker
+(see ``fcr.refresh``) re-fetches every sheet once per refresh interval. Only
+a sheet that has never been fetched makes a reader wait on the network.
+Server processes that share a cache directory also share these snapshots,
+so each sheet is downloaded once per refresh interval however many
+replicas are running.
+
+Page renders are bounded no matter how the upstream behaves: a reader waits
+at most ``LOAD_DEADLINE`` for a sheet that has never been fetched, and
+otherwise gets the last good snapshot while failed refreshes are retried in
+the background. ``staleness`` tells pages when that snapshot is out of
+date, and a circuit breaker (see ``fcr.breaker``) stops fetches against an
+upstream that keeps failing.
+
+Every change a refresh brings in is also recorded, day by day, in the
+sheet history (see ``fcr.history``). Passing ``day`` to the loaders below
+rebuilds a sheet, its cube and the ranking as they stood on that day.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from fcr import breaker as circuit
+from fcr import client as http_client
+from fcr import changes, crop, frames, history, ingest, kpi, ranking, schema, snapshots, sources, tehsils
+from fcr.cube import Cube
+from fcr.refresh import Refresher
+from fcr.store import Store
+
+
+SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
+
+SHEET_GIDS = {
+    "mutation": "2073381520",   # Mutation_Pending_Status
+    "musavi": "1163442311",     # Musavi_Validation_Status
+    "bhunaksha": "741935264",   # Bhunaksha_Data
+    "crop": "30899428",         # Digital Crop
+    "svamitwa": "1518724049",   # Svamitwa
+}
+
+SCHEMAS = {gid: schema.SCHEMAS[name] for name, gid in SHEET_GIDS.items()}
+
+SHEET_NAMES = {gid: name for name, gid in SHEET_GIDS.items()}
+
+# Seconds between background re-fetches of each sheet
+REFRESH_INTERVAL = 300
+
+# A snapshot fetched this recently by any process sharing the cache
+# directory is reused rather than fetched again
+FETCH_WINDOW = 0.9 * REFRESH_INTERVAL
+
+# Seconds a failed refresh waits before it is tried again
+RETRY_INTERVAL = 30
+
+# Seconds a reader waits for a sheet that has never been fetched
+LOAD_DEADLINE = 10
+
+# Seconds load_sheets() waits for a whole batch; a little over the
+# per-sheet deadline, so a sheet's own error (naming the cause) comes first
+SHEET_TIMEOUT = LOAD_DEADLINE + 2
+
+# A snapshot older than this is flagged as stale on the pages
+STALE_AFTER = 2 * REFRESH_INTERVAL
+
+log = logging.getLogger(__name__)
+
+
+# ==============================
+# FETCH
+# ==============================
+
+source = sources.from_env(SCHEMAS)
+
+# Stops fetching after repeated outages, see fcr.breaker; errors of a single
+# sheet (a missing tab or export) do not count, so they cannot stall the rest
+breaker = circuit.CircuitBreaker(is_failure=http_client.is_outage)
+
+
+class SheetUnavailable(RuntimeError):
+    """A sheet with no snapshot yet could not be loaded within the deadline."""
+
+
+def _appended_rows(spreadsheet_id, gid, export, previous):
+    """Raw and cleaned rows an export added after the previous one, or None.
+
+    Daily sheets only grow at the bottom. If the stored export is a prefix
+    of the new one and ends on a row boundary, only the bytes after it are
+    parsed. Anything else (edited rows, back-dated rows, a new layout) is
+    read in full by the caller.
+    """
+    sheet_schema = SCHEMAS.get(gid)
+    if (export.format != "csv" or previous is None or not previous.get("bytes")
+            or sheet_schema is None or sheet_schema.date_column is None):
+        return None
+
+    content, size = export.content, previous["bytes"]
+    if len(content) <= size or hashlib.sha256(content[:size]).hexdigest() != previous["content_hash"]:
+        return None
+
+    tail = content[size:]
+    if not content[:size].endswith(b"\n"):
+        if not tail.startswith((b"\n", b"\r\n")):
+            return None
+        tail = tail.lstrip(b"\r\n")
+
+    header = content[:content.index(b"\n") + 1]
+    raw = ingest.read(sources.Export(header + tail), sheet_schema)
+    rows = clean(gid, raw)
+
+    old = load_sheet_by_gid(spreadsheet_id, gid, previous["content_hash"])
+    date = sheet_schema.date_column
+    if len(rows) and len(old) and (
+        rows[date].iloc[0] < old[date].iloc[-1]
+        or rows["Tehsil"].dtype != old["Tehsil"].dtype
+    ):
+        return None
+
+    return raw, rows
+
+
+def _fetch(spreadsheet_id, gid, previous=None):
+    key = (spreadsheet_id, gid)
+
+    # The previous frame, for the change feed, before anything replaces it
+    old = None
+    if previous is not None:
+        try:
+            old = load_sheet_by_gid(spreadsheet_id, gid, previous["content_hash"])
+        except SheetUnavailable:
+            # Its files are gone: fetch the sheet as if for the first time
+            previous = None
+
+    validators = previous.get("validators") if previous is not None else None
+    export = breaker.call(source.fetch, spreadsheet_id, gid, validators)
+
+    if export.not_modified:
+        content_hash = previous["content_hash"]
+    else:
+        content_hash = hashlib.sha256(export.content).hexdigest()
+
+    if previous is not None and content_hash == previous["content_hash"]:
+        # Unchanged, as most refreshes are: the frame, cube and ranking all
+        # keyed by this hash still hold, so only the fetch time moves on
+        snapshots.touch(spreadsheet_id, gid, validators=export.validators)
+        return snapshots.read_meta(spreadsheet_id, gid)
+
+    appended = _appended_rows(spreadsheet_id, gid, export, previous)
+
+    if appended is not None:
+        raw, rows = appended
+        cleaned = pd.concat([old, rows], ignore_index=True)
+
+        snapshots.save_table(spreadsheet_id, gid, cleaned, content_hash)
+        snapshots.append(
+            spreadsheet_id, gid, raw, content_hash, len(export.content),
+            validators=export.validators,
+        )
+
+        # Carry the cube forward by the new days instead of rebuilding it
+        cube = store.get(key + ("cube",), previous["content_hash"])
+        cube = cube.extend(rows) if cube is not None else None
+        if cube is not None:
+            store.publish(key + ("cube",), content_hash, cube)
+    else:
+        # Only the columns the sheet's schema declares; headers come stripped
+        df = ingest.read(export, SCHEMAS.get(gid))
+
+        # A sheet whose layout no longer matches must not replace the last
+        # good snapshot, so check it before saving
+        if gid in SCHEMAS:
+            schema.validate(df, SCHEMAS[gid])
+        cleaned = clean(gid, df)
+
+        snapshots.save_table(spreadsheet_id, gid, cleaned, content_hash)
+        snapshots.save(
+            spreadsheet_id, gid, df, content_hash,
+            size=len(export.content), validators=export.validators,
+        )
+
+    # Publish the new frame before readers can learn the new hash
+    store.publish(key, content_hash, cleaned)
+
+    # Rows before ``start`` are the old frame's, unchanged
+    start = len(old) if appended is not None else 0
+
+    meta = snapshots.read_meta(spreadsheet_id, gid)
+    if old is not None:
+        _record_changes(spreadsheet_id, gid, old, cleaned, previous, meta, start)
+    _record_history(gid, cleaned, start)
+    return meta
+
+
+def _record_changes(spreadsheet_id, gid, old, cleaned, previous, meta, start=0):
+    """Diff the new export against the previous one, once per refresh."""
+    name = SHEET_NAMES.get(gid)
+    if name is None:
+        return
+
+    derived = ["tehsil_id"] + (crop.DASHBOARD_FIELDS if name == "crop" else [])
+    options = dict(
+        date=SCHEMAS[gid].date_column,
+        kpis=kpi.HOME_KPIS.get(name, ()),
+        since=previous["fetched_at"],
+        at=meta["fetched_at"],
+    )
+    try:
+        if start:
+            feed = changes.appended(name, old, cleaned, **options)
+        else:
+            feed = changes.compare(
+                name, old, cleaned,
+                columns=[c for c in cleaned.columns if c not in derived],
+                **options,
+            )
+        snapshots.save_changes(spreadsheet_id, gid, meta["content_hash"], feed.to_json())
+        store.publish((spreadsheet_id, gid, "changes"), meta["content_hash"], feed)
+    except Exception:
+        log.exception("Could not compute the changes to sheet %s", name)
+
+
+def _record_history(gid, cleaned, start=0):
+    """Record today's state of a sheet; history must never fail a refresh.
+
+    After an append only the rows from ``start`` on are new to the history.
+    """
+    name = SHEET_NAMES.get(gid)
+    if name is None:
+        return
+
+    # Only the sheet's own columns: ids and derived fields are rebuilt on load
+    derived = ["tehsil_id"] + (crop.DASHBOARD_FIELDS if name == "crop" else [])
+    sheet_schema = SCHEMAS[gid]
+    keys = ["Tehsil"] if sheet_schema.date_column is None else [sheet_schema.date_column, "Tehsil"]
+    today = date.today()
+
+    if start:
+        # Appended rows can only share a key with the old rows of its last
+        # day, so the history is handed the rows from that day on
+        first = int(cleaned[keys[0]].searchsorted(cleaned[keys[0]].iloc[start - 1]))
+        cleaned, start = cleaned.iloc[first:], start - first
+
+    try:
+        history.record(name, cleaned.drop(columns=derived, errors="ignore"), keys, today, start)
+        if name == "crop":
+            # Survey days drop off the sheet over time; the facts keep them
+            facts = crop.daily_facts(cleaned).drop(columns="tehsil_id")
+            history.record("crop_daily", facts, ["Date", "Tehsil"], today)
+    except Exception:
+        log.exception("Could not record the history of sheet %s", name)
+
+
+def refresh_sheet(spreadsheet_id, gid):
+    """Bring a sheet's snapshot up to date and return its metadata.
+
+    Processes sharing the cache directory take turns on each sheet: the
+    first downloads it, the others find its fresh snapshot and reuse it.
+    """
+    key = (spreadsheet_id, gid)
+    try:
+        with snapshots.fetch_lock(spreadsheet_id, gid):
+            meta = snapshots.read_meta(spreadsheet_id, gid)
+
+            if meta is not None and time.time() - meta["fetched_at"] < FETCH_WINDOW:
+                # Fetched by another process (or thread) this round
+                try:
+                    load_sheet_by_gid(spreadsheet_id, gid, meta["content_hash"])
+                except SheetUnavailable:
+                    meta = _fetch(spreadsheet_id, gid)
+            else:
+                meta = _fetch(spreadsheet_id, gid, meta)
+    except Exception as exc:
+        _failures[key] = exc
+        raise
+
+    _failures.pop(key, None)
+    _meta[key] = meta
+    return meta
+
+
+# ==============================
+# CLEANING (ONE PER SHEET)
+# ==============================
+
+def clean_sheet(df, sheet_schema):
+    # Summary rows would otherwise be counted as a tehsil of their own
+    df = tehsils.attach(tehsils.drop_totals(schema.apply(df, sheet_schema)))
+
+    # Daily sheets are kept in date order so pages can slice date ranges
+    if sheet_schema.date_column is not None:
+        df = frames.sort_by_date(df, sheet_schema.date_column)
+    return df
+
+
+def clean_crop(df):
+    return crop.add_dashboard_fields(clean_sheet(df, schema.CROP))
+
+
+CLEANERS = {
+    SHEET_GIDS["mutation"]: lambda df: clean_sheet(df, schema.MUTATION),
+    SHEET_GIDS["musavi"]: lambda df: clean_sheet(df, schema.MUSAVI),
+    SHEET_GIDS["bhunaksha"]: lambda df: clean_sheet(df, schema.BHUNAKSHA),
+    SHEET_GIDS["crop"]: clean_crop,
+    SHEET_GIDS["svamitwa"]: lambda df: clean_sheet(df, schema.SVAMITWA),
+}
+
+def clean(gid, df):
+    cleaner = CLEANERS.get(gid)
+    return cleaner(df) if cleaner is not None else df
+
+
+# ==============================
+# CACHED ACCESS
+# ==============================
+
+refresher = Refresher(REFRESH_INTERVAL, retry=RETRY_INTERVAL)
+
+# Cleaned frames per (spreadsheet id, gid), shared by every session
+store = Store()
+
+# Latest snapshot metadata per (spreadsheet id, gid), kept in memory so a
+# rerun can check for new data without touching the disk
+_meta = {}
+
+# Last refresh error per (spreadsheet id, gid), cleared by a good refresh
+_failures = {}
+
+# First fetches run here, so a reader can stop waiting at its deadline
+# while the fetch itself carries on
+_first_fetches = {}
+_first_fetch_guard = threading.Lock()
+_first_fetch_pool = ThreadPoolExecutor(
+    max_workers=len(SHEET_GIDS), thread_name_prefix="fcr-first-fetch"
+)
+
+
+def _schedule(spreadsheet_id, gid, delay):
+    refresher.schedule(
+        (spreadsheet_id, gid),
+        lambda: refresh_sheet(spreadsheet_id, gid),
+        delay=delay,
+    )
+
+
+def _first_fetch(spreadsheet_id, gid):
+    """Wait up to LOAD_DEADLINE for a sheet's first snapshot."""
+    key = (spreadsheet_id, gid)
+    with _first_fetch_guard:
+        future = _first_fetches.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _first_fetch_pool.submit(refresh_sheet, spreadsheet_id, gid)
+            _first_fetches[key] = future
+            # Should this attempt fail, keep trying in the background
+            _schedule(spreadsheet_id, gid, delay=RETRY_INTERVAL)
+
+    name = SHEET_NAMES.get(gid, gid)
+    try:
+        return future.result(timeout=LOAD_DEADLINE)
+    except TimeoutError:
+        raise SheetUnavailable(
+            f"The {name} sheet is taking too long to load; it will appear once fetched."
+        ) from None
+    except Exception as exc:
+        raise SheetUnavailable(f"Could not load the {name} sheet: {exc}") from exc
+
+
+def _current_meta(spreadsheet_id, gid):
+    key = (spreadsheet_id, gid)
+    meta = _meta.get(key) or snapshots.read_meta(spreadsheet_id, gid)
+
+    if meta is None:
+        # Never fetched: this is the only case where a reader waits
+        meta = _first_fetch(spreadsheet_id, gid)
+
+    _meta[key] = meta
+
+    age = time.time() - meta["fetched_at"]
+    _schedule(spreadsheet_id, gid, delay=max(0, REFRESH_INTERVAL - age))
+    return meta
+
+
+def load_sheet_by_gid(spreadsheet_id, gid, content_hash):
+    """Cleaned frame for an export. Shared by all sessions: do not modify."""
+    key = (spreadsheet_id, gid)
+    df = store.get(key, content_hash)
+
+    if df is None:
+        # Not in this process yet: map the table another process cleaned,
+        # or clean the snapshot on disk once and share the result
+        with store.build_lock(key):
+            df = store.get(key, content_hash)
+            if df is None:
+                df = snapshots.map_table(spreadsheet_id, gid, content_hash)
+                if df is not None:
+                    df = tehsils.adopt(df)
+                else:
+                    snapshot = snapshots.load(spreadsheet_id, gid)
+                    if snapshot is None:
+                        # Missing or unreadable files: have them fetched again
+                        refresher.run_soon(key)
+                        name = SHEET_NAMES.get(gid, gid)
+                        raise SheetUnavailable(
+                            f"The stored {name} sheet could not be read; it is being fetched again."
+                        )
+                    df = clean(gid, snapshot.frame)
+                    content_hash = snapshot.content_hash
+                    snapshots.save_table(spreadsheet_id, gid, df, content_hash)
+                store.publish(key, content_hash, df)
+
+    return df
+
+
+@st.cache_resource(show_spinner=False, max_entries=8 * len(SHEET_GIDS))
+def sheet_on_day(name, day):
+    # Only past days are asked for, and those no longer change
+    df = history.as_of(name, day)
+    if df.empty:
+        raise LookupError(f"No {name} history for {day:%d-%m-%Y}")
+    return clean(SHEET_GIDS[name], df)
+
+
+def load_sheet(name, day=None):
+    """Cleaned sheet, now or (with ``day``) as it stood on a past day."""
+    if day is not None:
+        return sheet_on_day(name, day)
+    meta = _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])
+    return load_sheet_by_gid(SPREADSHEET_ID, SHEET_GIDS[name], meta["content_hash"])
+
+
+def history_start():
+    """First day the history can rebuild, or None before any refresh.
+
+    A history database that cannot be read (busy, corrupt) only hides the
+    date picker; it never fails the page.
+    """
+    try:
+        return history.first_day()
+    except sqlite3.Error:
+        log.warning("Could not read the sheet history", exc_info=True)
+        return None
+
+
+# Daily sheets that get a pre-aggregated cube
+TIME_SERIES = ["mutation", "musavi", "bhunaksha", "svamitwa"]
+
+
+def cube_by_gid(spreadsheet_id, gid, content_hash):
+    # Shared, read-only object: one build per export for every session, or
+    # none at all when a refresh only appended rows (see _fetch)
+    return store.get_or_build(
+        (spreadsheet_id, gid, "cube"),
+        content_hash,
+        lambda: Cube.from_frame(load_sheet_by_gid(spreadsheet_id, gid, content_hash)),
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=8 * len(TIME_SERIES))
+def cube_on_day(name, day):
+    return Cube.from_frame(sheet_on_day(name, day))
+
+
+def load_cube(name, day=None):
+    if day is not None:
+        return cube_on_day(name, day)
+    meta = _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])
+    return cube_by_gid(SPREADSHEET_ID, SHEET_GIDS[name], meta["content_hash"])
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(TIME_SERIES))
+def latest_by_gid(spreadsheet_id, gid, content_hash):
+    return tehsils.attach(cube_by_gid(spreadsheet_id, gid, content_hash).as_of())
+
+
+@st.cache_resource(show_spinner=False, max_entries=8 * len(TIME_SERIES))
+def latest_on_day(name, day):
+    return tehsils.attach(cube_on_day(name, day).as_of())
+
+
+def load_latest(name, day=None):
+    """Each tehsil's latest day of a daily sheet, one row per tehsil."""
+    if day is not None:
+        return latest_on_day(name, day)
+    meta = _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])
+    return latest_by_gid(SPREADSHEET_ID, SHEET_GIDS[name], meta["content_hash"])
+
+
+def _recorded_facts(until=None):
+    facts = history.merged("crop_daily", until)
+    if facts.empty:
+        return pd.DataFrame(columns=crop.FACT_COLUMNS)
+    facts = tehsils.attach(facts.assign(Date=pd.to_datetime(facts["Date"])))
+    return facts.astype({"Plots Surveyed": "int32", "Surveyors on Field": "int32"})[crop.FACT_COLUMNS]
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def crop_daily_by_gid(spreadsheet_id, gid, content_hash):
+    # Days the sheet has since dropped still come from the history
+    current = crop.daily_facts(load_sheet_by_gid(spreadsheet_id, gid, content_hash))
+    return crop.merge_facts(_recorded_facts(), current)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def crop_daily_on_day(day):
+    return crop.merge_facts(_recorded_facts(day), crop.daily_facts(sheet_on_day("crop", day)))
+
+
+def load_crop_daily(day=None):
+    """Digital Crop survey days as a long, date-sorted table (see ``fcr.crop``)."""
+    if day is not None:
+        return crop_daily_on_day(day)
+    meta = _current_meta(SPREADSHEET_ID, SHEET_GIDS["crop"])
+    return crop_daily_by_gid(SPREADSHEET_ID, SHEET_GIDS["crop"], meta["content_hash"])
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _ranking(content_hashes, day=None):
+    # content_hashes only keys the cache: any changed sheet forces a rebuild
+    # Only the schemes the ranking scores; Digital Crop has no cube
+    cubes = {name: load_cube(name, day) for name in ranking.PENDENCY if name != "crop"}
+    return ranking.build(cubes, load_sheet("crop", day))
+
+
+def load_ranking(day=None):
+    """Cross-scheme tehsil ranking, built once per set of exports (or day)."""
+    if day is not None:
+        return _ranking((), day)
+    return _ranking(tuple(
+        _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])["content_hash"]
+        for name in ranking.PENDENCY
+    ))
+
+
+def _read_changes(spreadsheet_id, gid, content_hash):
+    feed = snapshots.read_changes(spreadsheet_id, gid, content_hash)
+    return changes.ChangeFeed.from_json(feed) if feed is not None else None
+
+
+def load_changes(name):
+    """What the latest export of a sheet changed (``fcr.changes.ChangeFeed``),
+    or None if it is the first one seen."""
+    gid = SHEET_GIDS[name]
+    meta = _current_meta(SPREADSHEET_ID, gid)
+    return store.get_or_build(
+        (SPREADSHEET_ID, gid, "changes"),
+        meta["content_hash"],
+        lambda: _read_changes(SPREADSHEET_ID, gid, meta["content_hash"]),
+    )
+
+
+def sheet_as_of(*names):
+    """Fetch time of the oldest of the given sheets, as a local datetime."""
+    names = names or tuple(SHEET_GIDS)
+    fetched_at = min(
+        _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])["fetched_at"]
+        for name in names
+    )
+    return datetime.fromtimestamp(fetched_at)
+
+
+def staleness(*names):
+    """Why the given sheets may be out of date, or None if they are fresh."""
+    names = names or tuple(SHEET_GIDS)
+    now = time.time()
+
+    stale = [
+        name for name in names
+        if (SPREADSHEET_ID, SHEET_GIDS[name]) in _failures
+        or now - _current_meta(SPREADSHEET_ID, SHEET_GIDS[name])["fetched_at"] > STALE_AFTER
+    ]
+    if not stale:
+        return None
+
+    note = (
+        "Google Sheets keeps failing, retries are paused briefly"
+        if breaker.is_open else "retrying in the background"
+    )
+    return f"Stale data from {sheet_as_of(*stale):%d-%m-%Y %H:%M}: {note}"
+
+
+def pick_as_of_day():
+    """Sidebar "As of date" picker: the chosen past day, or None for today.
+
+    Past days are rebuilt from the recorded sheet history (see
+    ``fcr.history``), so the picker only shows once there is one.
+    """
+    first_day = history_start()
+    today = date.today()
+    if first_day is None or first_day >= today:
+        return None
+
+    picked = st.sidebar.date_input(
+        "As of date", value=today, min_value=first_day, max_value=today
+    )
+    return picked if picked < today else None
+
+
+def show_freshness(*names):
+    """Caption a page with its sheets' fetch time, and a badge if stale."""
+    st.caption(f"Data as of {sheet_as_of(*names):%d-%m-%Y %H:%M}")
+
+    stale = staleness(*names)
+    if stale:
+        st.badge(stale, icon="⏳", color="orange")
+
+
+def load_sheets(names=None):
+    """Load several sheets at once; the slowest export bounds the wait."""
+    names = list(names or SHEET_GIDS)
+
+    # Worker threads share the caller's script context so the Streamlit
+    # calls made while loading behave as they would on the script thread.
+    ctx = get_script_run_ctx()
+    pool = ThreadPoolExecutor(
+        max_workers=len(names),
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+    )
+    futures = {name: pool.submit(load_sheet, name) for name in names}
+
+    deadline = time.monotonic() + SHEET_TIMEOUT
+    sheets = {}
+
+    try:
+        for name, future in futures.items():
+            try:
+                sheets[name] = future.result(
+                    timeout=max(0, deadline - time.monotonic())
+                )
+            except SheetUnavailable:
+                raise
+            except Exception as exc:
+                raise RuntimeError(f"Could not load the {name} sheet: {exc!r}") from exc
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return sheets
@@ -0,0 +1,48 @@
+"""Date-range access to the cleaned sheet frames.
+
+Daily sheets are sorted by date (then tehsil id) when they are cleaned, so
+a date range is a contiguous block of rows. ``date_slice`` finds it with two
+binary searches and returns a slice instead of a masked copy.
+``select`` applies a daily page's date-range and tehsil filters that way,
+and hands back the same filters for the sheet's cube.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fcr.tehsils import mask
+
+
+def sort_by_date(df, date="Date"):
+    """Order rows by date, then tehsil id, with a fresh positional index."""
+    keys = [date, "tehsil_id"] if "tehsil_id" in df.columns else [date]
+    return df.sort_values(keys, kind="stable", ignore_index=True)
+
+
+def _bound(value):
+    return np.datetime64(pd.Timestamp(value))
+
+
+def date_slice(df, start=None, end=None, date="Date"):
+    """Rows of a date-sorted ``df`` with ``start <= date <= end``."""
+    dates = df[date].to_numpy()
+    lo = 0 if start is None else dates.searchsorted(_bound(start), side="left")
+    hi = len(dates) if end is None else dates.searchsorted(_bound(end), side="right")
+    return df.iloc[lo:hi]
+
+
+def select(df, date_range, tehsils=None, date="Date"):
+    """Apply a page's filters to a date-sorted ``df``.
+
+    ``date_range`` is the value of the page's date input (a full range has
+    two dates). Returns the matching rows and the same filters as keyword
+    arguments for the sheet's cube, e.g. ``cube.as_of(**selection)``.
+    """
+    start, end = (
+        (pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]))
+        if len(date_range) == 2 else (None, None)
+    )
+    rows = date_slice(df, start, end, date)
+    if tehsils:
+        rows = rows[mask(rows, tehsils)]
+    return rows, dict(tehsils=list(tehsils) if tehsils else None, start=start, end=end)
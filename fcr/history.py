@@ -0,0 +1,176 @@
+"""Day-by-day history of every sheet, in SQLite.
+
+The Google Sheet only holds the current state: an overwritten row is gone.
+Each refresh records the cleaned rows of a sheet here, one version per row
+key per day. A row that did not change since the last recorded version is
+not written again (delta encoding), so storage grows with the edits rather
+than with the number of refreshes.
+
+A version is valid from ``valid_from`` up to, not including, ``valid_to``
+(NULL while current). ``as_of`` rebuilds a sheet as it stood on any
+recorded day with one indexed range lookup; ``merged`` keeps the newest
+version of every key ever seen, including rows the sheet has since dropped.
+
+A refresh that only appended rows records just those rows. The schema is
+set up once per process, and the first recorded day is cached, so pages
+can ask for it on every rerun without touching the database.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from fcr import snapshots
+
+
+DB_PATH = snapshots.CACHE_DIR / "history.sqlite"
+
+_SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS versions (
+    sheet      TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    valid_from TEXT NOT NULL,
+    valid_to   TEXT,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (sheet, key, valid_from)
+);
+CREATE INDEX IF NOT EXISTS versions_by_day ON versions (sheet, valid_from, valid_to);
+"""
+
+
+# Databases whose schema this process has set up
+_ready = set()
+
+# First recorded day per database, once known
+_first_days = {}
+
+_lock = threading.Lock()
+
+
+def _connect():
+    if DB_PATH not in _ready:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(DB_PATH, timeout=30)
+    if DB_PATH not in _ready:
+        db.executescript(_SCHEMA)
+        with _lock:
+            _ready.add(DB_PATH)
+    return db
+
+
+def _encode(frame, keys, start=0):
+    """{row key: JSON of the row} for the rows from ``start`` on.
+
+    Repeated keys are numbered in row order over the whole frame, so a key
+    keeps its number however many rows come after it.
+    """
+    ids = frame[keys[0]].astype(str)
+    for k in keys[1:]:
+        ids = ids + "|" + frame[k].astype(str)
+    ids = ids + "|" + frame.groupby(keys, observed=True, sort=False).cumcount().astype(str)
+
+    records = frame.iloc[start:].to_json(orient="records", lines=True, date_format="iso")
+    return dict(zip(ids.iloc[start:], records.splitlines()))
+
+
+def _decode(rows):
+    return pd.DataFrame.from_records([json.loads(data) for (data,) in rows])
+
+
+def record(sheet, frame, keys, day, start=0):
+    """Store the rows of ``frame`` that changed since the last recorded day.
+
+    With ``start``, the rows before it are taken as recorded already (the
+    sheet only grew): the rest are stored and no key is closed as gone.
+    """
+    rows = _encode(frame, list(keys), start)
+    day = day.isoformat()
+
+    with closing(_connect()) as db, db:
+        if start:
+            current = dict(db.execute(
+                "SELECT key, data FROM versions WHERE sheet = ? AND valid_to IS NULL "
+                "AND key IN (SELECT value FROM json_each(?))",
+                (sheet, json.dumps(list(rows))),
+            ))
+        else:
+            current = dict(db.execute(
+                "SELECT key, data FROM versions WHERE sheet = ? AND valid_to IS NULL", (sheet,)
+            ))
+
+        changed = [(k, d) for k, d in rows.items() if current.get(k) != d]
+        gone = [] if start else [k for k in current if k not in rows]
+
+        # Close the open versions from earlier days; a version opened today
+        # is simply replaced, so each key has at most one version per day
+        db.executemany(
+            "UPDATE versions SET valid_to = ? "
+            "WHERE sheet = ? AND key = ? AND valid_to IS NULL AND valid_from < ?",
+            [(day, sheet, k, day) for k, _ in changed] + [(day, sheet, k, day) for k in gone],
+        )
+        db.executemany(
+            "DELETE FROM versions WHERE sheet = ? AND key = ? AND valid_from = ?",
+            [(sheet, k, day) for k in gone],
+        )
+        db.executemany(
+            "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, NULL, ?)",
+            [(sheet, k, day, d) for k, d in changed],
+        )
+
+    if changed:
+        with _lock:
+            first = _first_days.get(DB_PATH)
+            if first is not None and day < first.isoformat():
+                _first_days[DB_PATH] = pd.Timestamp(day).date()
+
+    return len(changed) + len(gone)
+
+
+def as_of(sheet, day):
+    """The sheet's rows as they stood at the end of ``day``."""
+    day = day.isoformat()
+    with closing(_connect()) as db:
+        rows = db.execute(
+            "SELECT data FROM versions WHERE sheet = ? AND valid_from <= ? "
+            "AND (valid_to IS NULL OR valid_to > ?) ORDER BY rowid",
+            (sheet, day, day),
+        ).fetchall()
+    return _decode(rows)
+
+
+def merged(sheet, until=None):
+    """The newest version of every key recorded up to ``until`` (all if None)."""
+    until = "9999-12-31" if until is None else until.isoformat()
+    with closing(_connect()) as db:
+        rows = db.execute(
+            "SELECT data FROM ("
+            "  SELECT data, valid_from, ROW_NUMBER() OVER ("
+            "    PARTITION BY key ORDER BY valid_from DESC) AS newest"
+            "  FROM versions WHERE sheet = ? AND valid_from <= ?"
+            ") WHERE newest = 1 ORDER BY valid_from",
+            (sheet, until),
+        ).fetchall()
+    return _decode(rows)
+
+
+def first_day():
+    """The earliest recorded day, or None before the first refresh.
+
+    Looked up once per process: recording never moves it later, and
+    ``record`` moves it earlier itself.
+    """
+    first = _first_days.get(DB_PATH)
+    if first is not None:
+        return first
+
+    with closing(_connect()) as db:
+        (day,) = db.execute("SELECT MIN(valid_from) FROM versions").fetchone()
+    if day is None:
+        return None
+
+    with _lock:
+        return _first_days.setdefault(DB_PATH, pd.Timestamp(day).date())
@@ -0,0 +1,125 @@
+"""Parsing of sheet exports into frames.
+
+CSV exports are read with only the columns the sheet's schema declares
+(``schema.projection``), so unused columns are never materialised. Sheets
+whose schema sets a ``key`` are row-level tabs: they are streamed in
+chunks and each chunk is rolled up to the key as it arrives, so memory is
+bounded by the number of keys rather than the number of rows.
+
+``FCR_CSV_ENGINE=pyarrow`` parses CSV with pyarrow's multi-threaded reader
+instead of pandas; row-level tabs then use its streaming reader.
+"""
+
+import csv
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from fcr import schema
+
+
+ENGINE = os.environ.get("FCR_CSV_ENGINE", "pandas")
+
+# Rows per chunk when streaming a row-level tab with the pandas engine
+CHUNK_ROWS = 100_000
+
+# Bytes per block for pyarrow's reader
+BLOCK_SIZE = 8 << 20
+
+
+def header(content):
+    """Column names from the first line of a CSV export, with repeated
+    names suffixed ".1", ".2", ... the way pandas names them."""
+    first = io.TextIOWrapper(io.BytesIO(content), encoding="utf-8-sig", newline="")
+    names, seen = [], {}
+    for name in next(csv.reader(first), []):
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(f"{name}.{count}" if count else name)
+    return names
+
+
+def rollup(df, sheet_schema):
+    """Sum a typed frame's COUNT columns to ``sheet_schema.key``."""
+    keys = list(sheet_schema.key)
+    counts = [
+        c for c, t in schema.dtypes_for(df, sheet_schema).items()
+        if t == schema.COUNT and c not in keys
+    ]
+    return df.groupby(keys, observed=True, sort=False)[counts].sum().reset_index()
+
+
+def _pyarrow_options(names, columns):
+    return (
+        # Our own (de-duplicated) names instead of the header line
+        pa_csv.ReadOptions(block_size=BLOCK_SIZE, column_names=names, skip_rows=1),
+        pa_csv.ConvertOptions(
+            include_columns=columns,
+            # Everything as text: the schema does the typing, as for pandas
+            column_types={c: pa.string() for c in columns},
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def _positions(names, columns):
+    # By position: pandas matches usecols names before de-duplicating
+    keep = set(columns)
+    return [i for i, name in enumerate(names) if name in keep]
+
+
+def _chunks(content, names, columns, engine):
+    if engine == "pyarrow":
+        read_options, convert_options = _pyarrow_options(names, columns)
+        reader = pa_csv.open_csv(
+            io.BytesIO(content), read_options=read_options, convert_options=convert_options
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            io.BytesIO(content), usecols=_positions(names, columns), chunksize=CHUNK_ROWS
+        )
+
+
+def read_csv(content, sheet_schema=None, engine=ENGINE):
+    names = header(content)
+    columns = names
+    if sheet_schema is not None:
+        columns = schema.projection(names, sheet_schema)
+
+    if sheet_schema is not None and sheet_schema.key is not None:
+        partials = []
+        for chunk in _chunks(content, names, columns, engine):
+            chunk.columns = chunk.columns.str.strip()
+            partials.append(rollup(schema.apply(chunk, sheet_schema), sheet_schema))
+        return rollup(pd.concat(partials, ignore_index=True), sheet_schema)
+
+    if engine == "pyarrow":
+        read_options, convert_options = _pyarrow_options(names, columns)
+        df = pa_csv.read_csv(
+            io.BytesIO(content), read_options=read_options, convert_options=convert_options
+        ).to_pandas()
+    else:
+        df = pd.read_csv(io.BytesIO(content), usecols=_positions(names, columns))
+
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def read(export, sheet_schema=None, engine=ENGINE):
+    """Parse an ``Export``, keeping the columns ``sheet_schema`` declares."""
+    if export.frame is not None:
+        df = export.frame.copy(deep=False)
+    elif export.format == "parquet":
+        df = pd.read_parquet(io.BytesIO(export.content))
+    else:
+        return read_csv(export.content, sheet_schema, engine)
+
+    df.columns = df.columns.str.strip()
+    if sheet_schema is not None:
+        df = df[schema.projection(df.columns, sheet_schema)]
+    return df
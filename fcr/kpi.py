@@ -0,0 +1,99 @@
+"""Declarative KPIs for the home dashboard.
+
+Each scheme's KPIs are listed once as (key, label, columns) and computed in
+a single NumPy pass over that sheet: the rows for the selected tehsils are
+summed column-wise once, and every KPI is read off those column totals.
+"""
+
+from dataclasses import dataclass
+
+from fcr.tehsils import mask
+
+
+@dataclass(frozen=True)
+class KPI:
+    key: str
+    label: str
+    columns: tuple   # summed together
+
+
+@dataclass(frozen=True)
+class KpiResult:
+    scheme: str
+    kpis: tuple
+    values: dict
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def items(self):
+        """(label, value) pairs in definition order."""
+        return [(k.label, self.values[k.key]) for k in self.kpis]
+
+
+def _one(key, label, column):
+    return KPI(key, label, (column,))
+
+
+HOME_KPIS = {
+    "mutation": (
+        _one("patwari", "Patwari >30 Days", "Pendency at Patwari Level Beyond 30 days"),
+        _one("kanungo", "Kanungo >30 Days", "Pendency at Kanungo Level Beyond 30 days"),
+        _one("cro", "CRO >30 Days", "Pendency at CRO Level Beyond 30 days"),
+        _one("pending", "Total Mutation Pending", "Grand Total of Mutation pendency beyond 30 days"),
+    ),
+    "musavi": (
+        _one("villages", "Total Villages", "Total Villages"),
+        _one("received", "Maps Received", "Maps Received"),
+        _one("validated", "Maps Validated", "Maps Validated"),
+        KPI("pending", "Total Pending", ("Pending at Patwari", "Pending at CRO", "Pending at RPSC")),
+    ),
+    "bhunaksha": (
+        _one("shapefiles", "Shapefile Villages", "No. of Villages of which Shapefiles available with Districts"),
+        _one("initiated", "Villages Initiated", "Total no. of villages where tatima incorporation work has been initiated"),
+        _one("incorporated", "Tatima Incorporated", "Total no. of Tatimas incorporated"),
+        _one("pending", "Pending", "Tatima incorporation Pending at Patwari level"),
+        _one("completed", "Villages Completed", "No. of villages where Tatima work has been completed"),
+    ),
+    "crop": (
+        _one("villages", "Total Villages", "Total no. of villages"),
+        _one("total_plots", "Uploaded Plots", "Total number of uploaded plots"),
+        _one("surveyed", "Surveyed Plots", "Number of completed Plots till date"),
+        _one("pending", "Pending for Survey", "Pending for survey"),
+        _one("surveyors", "Surveyors Identified", "Number of Pvt. Surveyors identified"),
+    ),
+    "svamitwa": (
+        _one("villages", "Total No. of Villages under Scheme", "Total No. of Villages under Scheme"),
+        _one("received", "Total No. of Villages Received by Dist. from SoI", "Total No. of Villages Received by Dist. from SoI"),
+        _one("ground_truthed", "Villages where ground truthing completed & sent back to SoI", "Villages where ground truthing completed & sent back to SoI"),
+        _one("map1", "Map-1 Ground Truthing", "Map-1 Ground Truthing"),
+    ),
+}
+
+# KPI on each scheme that counts towards district pendency
+PENDING_KEY = "pending"
+
+
+def compute(scheme, df, kpis, tehsils=None):
+    """Evaluate ``kpis`` over the rows of ``df`` for ``tehsils`` (all if None)."""
+    columns = list(dict.fromkeys(c for k in kpis for c in k.columns))
+    data = df[columns].to_numpy(dtype="float64")
+
+    if tehsils is not None:
+        data = data[mask(df, tehsils)]
+
+    sums = dict(zip(columns, data.sum(axis=0)))
+
+    values = {k.key: int(sum(sums[c] for c in k.columns)) for k in kpis}
+    return KpiResult(scheme, kpis, values)
+
+
+def compute_all(sheets, tehsils=None, definitions=HOME_KPIS):
+    return {
+        scheme: compute(scheme, sheets[scheme], kpis, tehsils)
+        for scheme, kpis in definitions.items()
+    }
+
+
+def total_pendency(results):
+    return sum(r[PENDING_KEY] for r in results.values() if PENDING_KEY in r.values)
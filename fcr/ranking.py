@@ -0,0 +1,103 @@
+"""Cross-scheme pendency ranking of tehsils.
+
+Each tehsil's current pendency is taken from every scheme (latest day for
+the daily sheets, the live figure for Digital Crop) and turned into its
+share of the district's pendency in that scheme. The score is the average
+share, in percent, so schemes counted in plots and schemes counted in
+villages weigh the same. The table is built once per refresh; top-k and
+bottom-k are partial selections over the precomputed scores.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fcr.tehsils import DIMENSION
+
+
+# Scheme -> columns whose sum is that scheme's pendency
+PENDENCY = {
+    "mutation": ["Grand Total of Mutation pendency beyond 30 days"],
+    "musavi": ["Pending at Patwari", "Pending at CRO", "Pending at RPSC"],
+    "bhunaksha": ["Tatima incorporation Pending at Patwari level"],
+    "crop": ["Pending for survey"],
+}
+
+
+def _latest_per_tehsil(cube, columns, size):
+    """Pendency on each tehsil's most recent day, and which tehsils have rows."""
+    out = np.zeros(size)
+    present = np.zeros(size, dtype=bool)
+
+    snapshot = cube.as_of(columns)
+    ids = DIMENSION.ids_of(snapshot["Tehsil"])
+
+    out[ids] = snapshot[columns].to_numpy().sum(axis=1)
+    present[ids] = True
+    return out, present
+
+
+def _total_per_tehsil(df, columns, size):
+    ids = df["tehsil_id"].to_numpy()
+    keep = ids >= 0
+    weights = df[columns].to_numpy(dtype="float64").sum(axis=1)
+
+    out = np.bincount(ids[keep], weights=weights[keep], minlength=size)
+    present = np.bincount(ids[keep], minlength=size) > 0
+    return out, present
+
+
+@dataclass(frozen=True)
+class Ranking:
+    table: pd.DataFrame   # one row per tehsil id, scheme pendencies + score
+    scores: np.ndarray
+    present: np.ndarray   # tehsil ids that appear in at least one sheet
+
+    def _select(self, k, tehsils, largest):
+        pos = np.flatnonzero(self.present)
+        if tehsils is not None:
+            pos = pos[np.isin(pos, DIMENSION.ids_of(tehsils))]
+
+        k = min(k, len(pos))
+        if k == 0:
+            return self.table.iloc[[]]
+
+        keys = (-self.scores if largest else self.scores)[pos]
+        best = np.argpartition(keys, k - 1)[:k]
+        best = best[np.argsort(keys[best], kind="stable")]
+        return self.table.iloc[pos[best]]
+
+    def top(self, k=3, tehsils=None):
+        """The k tehsils with the highest pendency score."""
+        return self._select(k, tehsils, largest=True)
+
+    def bottom(self, k=3, tehsils=None):
+        """The k tehsils with the lowest pendency score."""
+        return self._select(k, tehsils, largest=False)
+
+
+def build(cubes, crop_df):
+    """Score every tehsil from the daily cubes and the Digital Crop sheet."""
+    size = len(DIMENSION.names)
+
+    pending, present = {}, np.zeros(size, dtype=bool)
+
+    for scheme, columns in PENDENCY.items():
+        if scheme == "crop":
+            values, seen = _total_per_tehsil(crop_df, columns, size)
+        else:
+            values, seen = _latest_per_tehsil(cubes[scheme], columns, size)
+        pending[scheme] = values
+        present |= seen
+
+    table = pd.DataFrame(pending)
+    totals = table.sum(axis=0).to_numpy()
+    shares = np.divide(table.to_numpy(), totals, out=np.zeros(table.shape), where=totals > 0)
+    scores = shares.mean(axis=1) * 100
+
+    table.insert(0, "Tehsil", DIMENSION.names[:size])
+    table["Total"] = table[list(PENDENCY)].sum(axis=1)
+    table["Score"] = scores
+
+    return Ranking(table, scores, present)
@@ -0,0 +1,74 @@
+"""Background worker that keeps sheet snapshots fresh.
+
+Readers never wait on the network once a sheet has been loaded: they keep
+getting the last good snapshot while this worker re-fetches each sheet on
+its own schedule. A job that fails is tried again after ``retry`` seconds
+rather than a whole interval later.
+"""
+
+import logging
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+class Refresher:
+    """Run registered jobs every ``interval`` seconds in one daemon thread."""
+
+    def __init__(self, interval, retry=None):
+        self.interval = interval
+        self.retry = interval if retry is None else min(retry, interval)
+        self._jobs = {}
+        self._due = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def schedule(self, key, job, delay=None):
+        """Register ``job`` under ``key``; later calls for the same key are no-ops."""
+        with self._lock:
+            if key in self._jobs:
+                return
+            self._jobs[key] = job
+            self._due[key] = time.monotonic() + (self.interval if delay is None else delay)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="fcr-refresher", daemon=True
+                )
+                self._thread.start()
+
+        self._wake.set()
+
+    def run_soon(self, key):
+        """Bring a registered job forward to the next turn of the worker."""
+        with self._lock:
+            if key not in self._jobs:
+                return
+            self._due[key] = time.monotonic()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                due = [key for key, at in self._due.items() if at <= now]
+                next_at = min(self._due.values(), default=now + self.interval)
+
+            for key in due:
+                delay = self.interval
+                try:
+                    self._jobs[key]()
+                except Exception:
+                    # Keep serving the last good snapshot; try again soon
+                    log.exception("Refresh of %s failed", key)
+                    delay = self.retry
+
+                with self._lock:
+                    self._due[key] = time.monotonic() + delay
+
+            if not due:
+                self._wake.wait(max(0, next_at - time.monotonic()))
+                self._wake.clear()
@@ -0,0 +1,226 @@
+"""Column schemas for every sheet.
+
+Each schema lists the columns a sheet must provide, the header spellings
+they may arrive under, and the compact dtype they are stored in. ``apply``
+renames, coerces and casts a freshly parsed export in one pass, so cached
+frames are small and pages never re-parse strings on a rerun.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+# Storage dtypes
+CATEGORY = "category"
+COUNT = "int32"
+RATE = "float32"
+DATE = "datetime64[ns]"
+PERCENT = "percent"   # "12.5%" text stored as float32 12.5
+TEXT = "string"
+
+
+class SchemaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    dtype: str
+    aliases: tuple = ()
+    required: bool = True
+
+
+@dataclass(frozen=True)
+class SheetSchema:
+    name: str
+    columns: tuple
+    # (regex, dtype) pairs for columns whose headers change over time
+    patterns: tuple = ()
+    # dtype for any other column; None leaves it as parsed
+    extra: str = None
+    date_column: str = "Date"
+    # Columns identifying a row after roll-up. Set for row-level tabs (e.g.
+    # one row per village): their COUNT columns are summed to this grain
+    # while the export streams in, and other columns must be optional.
+    key: tuple = None
+    _by_name: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_by_name", {c.name: c for c in self.columns})
+
+    def column(self, name):
+        return self._by_name[name]
+
+    @property
+    def names(self):
+        return [c.name for c in self.columns]
+
+
+def _tehsil(*aliases):
+    return Column("Tehsil", CATEGORY, aliases)
+
+
+MUTATION = SheetSchema(
+    "mutation",
+    (
+        Column("Date", DATE),
+        _tehsil(),
+        Column("Pendency at Patwari Level Beyond 15 days", COUNT),
+        Column("Pendency at Patwari Level Beyond 30 days", COUNT),
+        Column("Total", COUNT),
+        Column("Pendency at Kanungo Level Beyond 20 days", COUNT),
+        Column("Pendency at Kanungo Level Beyond 30 days", COUNT),
+        Column("Total.1", COUNT),
+        Column("Pendency at CRO Level Beyond 30 days", COUNT),
+        Column("Grand Total of Mutation pendency beyond 30 days", COUNT),
+    ),
+)
+
+MUSAVI = SheetSchema(
+    "musavi",
+    (
+        Column("Date", DATE),
+        _tehsil("Tehsil / Sub-Tehsil"),
+        Column("Total Villages", COUNT),
+        Column("Maps Received", COUNT),
+        Column("Maps Validated", COUNT),
+        Column("Pending at Patwari", COUNT),
+        Column("Pending at CRO", COUNT),
+        Column("Pending at RPSC", COUNT),
+        Column("Total CRO Validation Done", COUNT),
+    ),
+)
+
+BHUNAKSHA = SheetSchema(
+    "bhunaksha",
+    (
+        Column("Date", DATE),
+        _tehsil("Name of Tehsil/Sub Tehsil"),
+        Column("No. of Villages of which Shapefiles available with Districts", COUNT),
+        Column("Total no. of villages where tatima incorporation work has been initiated", COUNT),
+        Column("Total no. of Tatima to be incorporated", COUNT),
+        Column("Total no. of Tatimas incorporated", COUNT),
+        Column("Tatima incorporation Pending at Patwari level", COUNT),
+        Column("No. of villages where Tatima work has been completed", COUNT),
+        Column("No. of villages where Tatima Incorporation work initiated (uploaded by ASMs)", COUNT),
+    ),
+)
+
+CROP = SheetSchema(
+    "crop",
+    (
+        _tehsil("Tehsil/Sub Tehsil"),
+        Column("Total no. of villages", COUNT),
+        Column("Number of villages allocated", COUNT),
+        Column("Total number of uploaded plots", COUNT),
+        Column("Number of completed Plots till date", COUNT),
+        Column("Pending for survey", COUNT),
+        Column("Number of Pvt. Surveyors identified", COUNT),
+        Column("Performance  in %", PERCENT),
+    ),
+    patterns=(
+        (r"^Plots surveyed on ", COUNT),
+        (r"^Surveyors on field", COUNT),
+    ),
+    date_column=None,
+)
+
+SVAMITWA = SheetSchema(
+    "svamitwa",
+    (
+        Column("Date", DATE),
+        _tehsil("Name of Tehsil"),
+        Column("Name of Tehsil sub parts", TEXT, required=False),
+        Column("Total No. of Villages under Scheme", RATE),
+        Column("Total No. of Villages Received by Dist. from SoI", RATE),
+        Column("Villages where ground truthing completed & sent back to SoI", RATE),
+        Column("Map-1 Ground Truthing", RATE),
+    ),
+    extra=RATE,
+)
+
+SCHEMAS = {s.name: s for s in (MUTATION, MUSAVI, BHUNAKSHA, CROP, SVAMITWA)}
+
+
+def _rename(df, schema):
+    renames = {}
+    for col in schema.columns:
+        if col.name in df.columns:
+            continue
+        for alias in col.aliases:
+            if alias in df.columns:
+                renames[alias] = col.name
+                break
+    return df.rename(columns=renames) if renames else df
+
+
+def projection(header, schema):
+    """The raw header names in ``header`` that ``schema`` keeps."""
+    if schema.extra is not None:
+        return list(header)
+
+    wanted = set(schema.names)
+    wanted.update(a for c in schema.columns for a in c.aliases)
+    return [
+        raw for raw in header
+        if raw.strip() in wanted
+        or any(re.search(pattern, raw.strip()) for pattern, _ in schema.patterns)
+    ]
+
+
+def validate(df, schema):
+    """Raise SchemaError unless ``df`` has every required column of ``schema``."""
+    df = _rename(df, schema)
+    missing = [c.name for c in schema.columns if c.required and c.name not in df.columns]
+    if missing:
+        raise SchemaError(f"{schema.name} sheet is missing columns: {', '.join(missing)}")
+    return df
+
+
+def dtypes_for(df, schema):
+    dtypes = {}
+    for name in df.columns:
+        if name in schema._by_name:
+            dtypes[name] = schema._by_name[name].dtype
+            continue
+        for pattern, dtype in schema.patterns:
+            if re.search(pattern, name):
+                dtypes[name] = dtype
+                break
+        else:
+            if schema.extra is not None:
+                dtypes[name] = schema.extra
+    return dtypes
+
+
+def apply(df, schema):
+    """Return ``df`` renamed and cast to ``schema``'s storage dtypes."""
+    df = validate(df, schema)
+    dtypes = dtypes_for(df, schema)
+
+    numeric = [c for c, t in dtypes.items() if t in (COUNT, RATE)]
+    percent = [c for c, t in dtypes.items() if t == PERCENT]
+    dates = [c for c, t in dtypes.items() if t == DATE]
+
+    coerced = {}
+    for col in percent:
+        coerced[col] = df[col].astype(str).str.replace("%", "", regex=False).str.strip()
+        dtypes[col] = RATE
+        numeric.append(col)
+    for col in numeric:
+        coerced[col] = pd.to_numeric(coerced.get(col, df[col]), errors="coerce")
+    for col in dates:
+        coerced[col] = pd.to_datetime(df[col], errors="coerce")
+
+    df = df.assign(**coerced)
+
+    if schema.date_column is not None:
+        df = df.dropna(subset=[schema.date_column])
+
+    df[numeric] = df[numeric].fillna(0)
+
+    # One cast for every column, so the cached frame holds compact dtypes
+    return df.astype(dtypes)
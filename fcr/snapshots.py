@@ -0,0 +1,268 @@
+"""On-disk Parquet snapshots of sheet exports.
+
+Every successful fetch is written to ``<cache dir>/<spreadsheet id>/<gid>``
+as a Parquet file plus a small JSON sidecar holding the fetch time and a
+hash of the raw export. An export that only adds rows to the stored one is
+kept as an extra Parquet part holding just those rows. After a restart the
+pages read these files instead of waiting on Google.
+
+The sidecar is the commit point. Each whole export starts a new generation
+whose base and parts carry the generation in their names, and the sidecar
+listing them is written last, with one atomic rename. A reader therefore
+sees either the old set of files or the new one, never a mix; files of
+older generations are only removed after the new sidecar is in place.
+
+Next to each snapshot sits the cleaned, typed table as an uncompressed
+Arrow IPC file. It is written once per export by whichever process cleans
+it first; every other process memory-maps it instead of parsing and
+cleaning the Parquet file again, and the OS page cache holds one copy of
+the data for all of them.
+
+The change feed of the latest export (see ``fcr.changes``) is kept beside
+it as JSON, so replicas that reuse a snapshot also show its changes.
+
+The cache directory is also where processes coordinate: ``fetch_lock``
+takes an exclusive lock file per sheet, so replicas sharing the directory
+fetch a sheet one at a time and can reuse each other's snapshots.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are coordinated
+    fcntl = None
+
+
+CACHE_DIR = Path(
+    os.environ.get("FCR_CACHE_DIR", Path(__file__).resolve().parent.parent / ".fcr_cache")
+)
+
+
+@dataclass
+class Snapshot:
+    frame: pd.DataFrame
+    fetched_at: float
+    content_hash: str
+
+
+def _paths(spreadsheet_id, gid):
+    base = CACHE_DIR / spreadsheet_id
+    return base, base / f"{gid}.json"
+
+
+def _base_name(meta):
+    # Sidecars written before generations existed name no base file
+    return meta.get("base", f"{meta['gid']}.parquet")
+
+
+def _table_path(spreadsheet_id, gid):
+    return CACHE_DIR / spreadsheet_id / f"{gid}.arrow"
+
+
+# Schema metadata key tying a cleaned table to the export it came from
+_HASH_KEY = b"fcr_content_hash"
+
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+@contextmanager
+def fetch_lock(spreadsheet_id, gid):
+    """Hold the right to fetch a sheet, exclusive across threads and processes."""
+    with _thread_locks_guard:
+        lock = _thread_locks.setdefault((spreadsheet_id, gid), threading.Lock())
+
+    with lock:
+        if fcntl is None:
+            yield
+            return
+
+        path = CACHE_DIR / spreadsheet_id / f"{gid}.lock"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _replace(path, write):
+    # Write next to the target and rename, so readers never see half a file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_meta(meta_path, meta):
+    _replace(meta_path, lambda p: p.write_text(json.dumps(meta, indent=2)))
+
+
+def save(spreadsheet_id, gid, frame, content_hash, fetched_at=None, size=None,
+         validators=None):
+    """Store a whole export; ``size`` is its length in bytes, if known, and
+    ``validators`` its ETag / Last-Modified for the next conditional fetch."""
+    folder, meta_path = _paths(spreadsheet_id, gid)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    previous = read_meta(spreadsheet_id, gid) or {}
+    generation = previous.get("generation", 0) + 1
+    base = f"{gid}.g{generation}.parquet"
+
+    meta = {
+        "spreadsheet_id": spreadsheet_id,
+        "gid": gid,
+        "fetched_at": time.time() if fetched_at is None else fetched_at,
+        "content_hash": content_hash,
+        "rows": len(frame),
+        "bytes": size,
+        "generation": generation,
+        "base": base,
+        "parts": [],
+        "validators": validators or {},
+    }
+
+    _replace(folder / base, lambda p: frame.to_parquet(p, index=False))
+    _write_meta(meta_path, meta)
+
+    # Older generations are unreachable now; a reader still holding their
+    # sidecar reads it again (see load)
+    for stale in folder.glob(f"{gid}.*parquet"):
+        if stale.name != base:
+            stale.unlink(missing_ok=True)
+
+
+def append(spreadsheet_id, gid, frame, content_hash, size, fetched_at=None, validators=None):
+    """Store the rows an export added to the stored one, as a new part file."""
+    folder, meta_path = _paths(spreadsheet_id, gid)
+    meta = read_meta(spreadsheet_id, gid)
+
+    name = (
+        f"{gid}.g{meta.get('generation', 0)}.part-{len(meta['parts']) + 1}"
+        f"-{content_hash[:12]}.parquet"
+    )
+    _replace(folder / name, lambda p: frame.to_parquet(p, index=False))
+
+    meta.update(
+        fetched_at=time.time() if fetched_at is None else fetched_at,
+        content_hash=content_hash,
+        rows=meta["rows"] + len(frame),
+        bytes=size,
+        parts=meta["parts"] + [name],
+        validators=validators or {},
+    )
+    _write_meta(meta_path, meta)
+
+
+def touch(spreadsheet_id, gid, fetched_at=None, validators=None):
+    """Record a fetch that found the stored export unchanged."""
+    _, meta_path = _paths(spreadsheet_id, gid)
+    meta = read_meta(spreadsheet_id, gid)
+    meta["fetched_at"] = time.time() if fetched_at is None else fetched_at
+    if validators:
+        meta["validators"] = validators
+    _write_meta(meta_path, meta)
+
+
+def read_meta(spreadsheet_id, gid):
+    _, meta_path = _paths(spreadsheet_id, gid)
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_files(folder, meta):
+    prefix = f"{meta['gid']}.g{meta.get('generation')}.part-"
+    if "generation" in meta and not all(n.startswith(prefix) for n in meta["parts"]):
+        raise ValueError("snapshot parts belong to another generation")
+
+    frames = [pd.read_parquet(folder / _base_name(meta))]
+    frames += [pd.read_parquet(folder / name) for name in meta.get("parts", [])]
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def load(spreadsheet_id, gid):
+    """Return the stored Snapshot, or None if there is no usable one."""
+    folder, _ = _paths(spreadsheet_id, gid)
+
+    # A save in another process may replace the files between reading the
+    # sidecar and the data; the sidecar then names the new ones
+    for _ in range(3):
+        meta = read_meta(spreadsheet_id, gid)
+        if meta is None:
+            return None
+        try:
+            frame = _read_files(folder, meta)
+        except Exception:
+            continue
+        return Snapshot(frame, meta["fetched_at"], meta["content_hash"])
+
+    return None
+
+
+def _changes_path(spreadsheet_id, gid):
+    return CACHE_DIR / spreadsheet_id / f"{gid}.changes.json"
+
+
+def save_changes(spreadsheet_id, gid, content_hash, feed):
+    """Store the change feed (JSON text) that led to an export."""
+    path = _changes_path(spreadsheet_id, gid)
+    payload = json.dumps({"content_hash": content_hash, "feed": feed})
+    _replace(path, lambda p: p.write_text(payload))
+
+
+def read_changes(spreadsheet_id, gid, content_hash):
+    """The change feed stored for an export, or None."""
+    try:
+        payload = json.loads(_changes_path(spreadsheet_id, gid).read_text())
+    except (OSError, ValueError):
+        return None
+    return payload["feed"] if payload.get("content_hash") == content_hash else None
+
+
+def save_table(spreadsheet_id, gid, frame, content_hash):
+    """Write the cleaned frame for an export as an Arrow IPC file."""
+    path = _table_path(spreadsheet_id, gid)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _HASH_KEY: content_hash.encode()}
+    )
+
+    def write(tmp):
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _replace(path, write)
+
+
+def map_table(spreadsheet_id, gid, content_hash):
+    """Memory-map the cleaned frame for an export, or None if there is none.
+
+    Numeric columns are views of the mapped file, so the frame is read-only
+    and costs no private memory until something writes to it.
+    """
+    try:
+        source = pa.memory_map(str(_table_path(spreadsheet_id, gid)), "r")
+        table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    if (table.schema.metadata or {}).get(_HASH_KEY) != content_hash.encode():
+        return None
+    return table.to_pandas(split_blocks=True)
@@ -0,0 +1,225 @@
+"""Where sheet exports come from.
+
+The dashboard reads every sheet through a source object with a single
+``fetch(spreadsheet_id, gid)`` method returning an ``Export``. The backend is
+picked from the ``FCR_SOURCE`` environment variable, so page code never
+changes between environments:
+
+``google`` (default)
+    The live Google Sheets CSV export.
+``http://host:port``
+    Any server speaking the Google export URL scheme, e.g. the stub in
+    ``fcr.stub_server``.
+``local:/path/to/dir``
+    CSV or Parquet files named ``<gid>.csv`` / ``<gid>.parquet``, either
+    directly in the directory or under a ``<spreadsheet id>/`` subfolder.
+``workbook``, ``workbook:http://host:port``, ``workbook:/path/to/file.xlsx``
+    The whole spreadsheet as one xlsx download (or a local xlsx file), with
+    every sheet cut from that single copy. Tabs are matched to gids by
+    their columns, since the xlsx export does not carry gids.
+
+``fetch`` also takes the validators (ETag, Last-Modified) of the previous
+export. A source that can tell the sheet has not changed since then answers
+with an empty ``Export`` marked ``not_modified`` instead of the content.
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from fcr import client as http_client
+from fcr import schema
+
+
+GOOGLE_BASE_URL = "https://docs.google.com"
+
+# Seconds one workbook download keeps serving its sheets, long enough for
+# every sheet's refresh in a round to share it
+WORKBOOK_MAX_AGE = 60
+
+
+@dataclass
+class Export:
+    content: bytes
+    format: str = "csv"
+    frame: pd.DataFrame | None = None   # already parsed, for the "frame" format
+    validators: dict | None = None      # {"etag": ..., "last_modified": ...} when known
+    not_modified: bool = False          # unchanged since the validators passed to fetch
+
+
+class GoogleExportSource:
+    def __init__(self, base_url=GOOGLE_BASE_URL, client=None):
+        self.base_url = base_url.rstrip("/")
+        self.client = client or http_client.default()
+
+    def url(self, spreadsheet_id, gid):
+        return f"{self.base_url}/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={gid}"
+
+    def fetch(self, spreadsheet_id, gid, validators=None):
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        resp = self.client.get(self.url(spreadsheet_id, gid), headers=headers)
+        if resp.status_code == 304:
+            return Export(b"", validators=validators, not_modified=True)
+        resp.raise_for_status()
+
+        return Export(resp.content, validators={
+            key: value for key, value in (
+                ("etag", resp.headers.get("ETag")),
+                ("last_modified", resp.headers.get("Last-Modified")),
+            ) if value
+        })
+
+    def __repr__(self):
+        return f"GoogleExportSource({self.base_url!r})"
+
+
+class LocalDirectorySource:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, spreadsheet_id, gid):
+        for folder in (self.root / spreadsheet_id, self.root):
+            for fmt in ("parquet", "csv"):
+                candidate = folder / f"{gid}.{fmt}"
+                if candidate.exists():
+                    return candidate
+        raise FileNotFoundError(f"No export for gid {gid} under {self.root}")
+
+    def fetch(self, spreadsheet_id, gid, validators=None):
+        path = self.path(spreadsheet_id, gid)
+        stat = path.stat()
+        current = {"etag": f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"}
+        if validators == current:
+            return Export(b"", path.suffix.lstrip("."), validators=current, not_modified=True)
+        return Export(path.read_bytes(), path.suffix.lstrip("."), validators=current)
+
+    def __repr__(self):
+        return f"LocalDirectorySource({str(self.root)!r})"
+
+
+class WorkbookSource:
+    """Every sheet from a single download of the whole workbook.
+
+    ``location`` is a base URL speaking the Google export scheme or the path
+    of a local xlsx file. ``schemas`` maps gid -> SheetSchema and decides
+    which tab feeds which gid.
+    """
+
+    def __init__(self, location=GOOGLE_BASE_URL, schemas=None, client=None,
+                 max_age=WORKBOOK_MAX_AGE):
+        self.location = str(location).rstrip("/")
+        self.schemas = schemas or {}
+        self.client = client or http_client.default()
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._workbooks = {}   # spreadsheet id -> (monotonic time, {gid: Export})
+
+    @property
+    def is_remote(self):
+        return self.location.startswith(("http://", "https://"))
+
+    def url(self, spreadsheet_id):
+        return f"{self.location}/spreadsheets/d/{spreadsheet_id}/export?format=xlsx"
+
+    def download(self, spreadsheet_id):
+        if not self.is_remote:
+            return Path(self.location).read_bytes()
+        resp = self.client.get(self.url(spreadsheet_id))
+        resp.raise_for_status()
+        return resp.content
+
+    def _match(self, header):
+        """gid whose schema fits a tab's header best, or None."""
+        best, best_size = None, -1
+        for gid, sheet_schema in self.schemas.items():
+            try:
+                schema.validate(header, sheet_schema)
+            except schema.SchemaError:
+                continue
+            if len(sheet_schema.columns) > best_size:
+                best, best_size = gid, len(sheet_schema.columns)
+        return best
+
+    def split(self, content):
+        """Parse the tabs that match a schema, as {gid: Export}."""
+        book = pd.ExcelFile(io.BytesIO(content))
+
+        tabs = {}
+        for name in book.sheet_names:
+            header = book.parse(name, nrows=0)
+            header.columns = header.columns.astype(str).str.strip()
+            gid = self._match(header)
+            if gid is not None and gid not in tabs:
+                tabs[gid] = name
+
+        exports = {}
+        for gid, name in tabs.items():
+            frame = book.parse(name)
+            frame.columns = frame.columns.astype(str).str.strip()
+
+            # Percent cells come out of xlsx as fractions; the CSV export
+            # and the cleaners use 0-100
+            for column in self.schemas[gid].columns:
+                if (column.dtype == schema.PERCENT and column.name in frame.columns
+                        and pd.api.types.is_numeric_dtype(frame[column.name])):
+                    frame[column.name] = frame[column.name] * 100
+
+            exports[gid] = Export(_frame_digest(frame), "frame", frame)
+        return exports
+
+    def fetch(self, spreadsheet_id, gid, validators=None):
+        # Tabs carry no validators of their own; unchanged tabs are caught
+        # by their content hash instead
+        with self._lock:
+            cached = self._workbooks.get(spreadsheet_id)
+            if cached is None or time.monotonic() - cached[0] > self.max_age:
+                cached = (time.monotonic(), self.split(self.download(spreadsheet_id)))
+                self._workbooks[spreadsheet_id] = cached
+
+        exports = cached[1]
+        if gid not in exports:
+            raise LookupError(f"No tab in workbook {spreadsheet_id} matches gid {gid}")
+        return exports[gid]
+
+    def __repr__(self):
+        return f"WorkbookSource({self.location!r})"
+
+
+def _frame_digest(frame):
+    # Stands in for the raw bytes of a per-sheet export when hashing content
+    digest = hashlib.sha256("\x1f".join(frame.columns).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.digest()
+
+
+def from_config(value, schemas=None):
+    value = (value or "google").strip()
+
+    if value == "workbook":
+        return WorkbookSource(GOOGLE_BASE_URL, schemas)
+    if value.startswith("workbook:"):
+        return WorkbookSource(value[len("workbook:"):], schemas)
+    if value == "google":
+        return GoogleExportSource()
+    if value.startswith(("http://", "https://")):
+        return GoogleExportSource(value)
+    if value.startswith("local:"):
+        return LocalDirectorySource(value[len("local:"):])
+
+    raise ValueError(f"Unrecognised FCR_SOURCE {value!r}")
+
+
+def from_env(schemas=None):
+    return from_config(os.environ.get("FCR_SOURCE"), schemas)
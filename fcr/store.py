@@ -0,0 +1,59 @@
+"""Process-wide store of cleaned sheet frames.
+
+``st.cache_data`` hands every caller its own copy of a cached frame, so each
+open session held a private copy of every sheet. The store instead keeps one
+frame per sheet for the whole process and gives every session the same
+object, which callers must treat as read-only.
+
+Updates are read-copy-update: a new frame is built off to the side and
+published by swapping in a new entry table, so readers never take a lock
+and never see a half-built value. The replaced frame is freed once the last
+session holding it moves on.
+"""
+
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Entry:
+    version: str    # content hash of the export the value was built from
+    value: object
+
+
+class Store:
+
+    def __init__(self):
+        self._entries = {}
+        self._write_lock = threading.Lock()
+        self._build_locks = {}
+
+    def get(self, key, version=None):
+        """The published value for ``key``, or None if missing or another version."""
+        entry = self._entries.get(key)
+        if entry is None or (version is not None and entry.version != version):
+            return None
+        return entry.value
+
+    def publish(self, key, version, value):
+        with self._write_lock:
+            entries = dict(self._entries)
+            entries[key] = Entry(version, value)
+            self._entries = entries
+
+    def build_lock(self, key):
+        """Lock that keeps two sessions from building the same key at once."""
+        with self._write_lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def get_or_build(self, key, version, build):
+        """The value for ``key`` at ``version``, building and publishing it
+        with ``build()`` if needed; one builder per key at a time."""
+        value = self.get(key, version)
+        if value is None:
+            with self.build_lock(key):
+                value = self.get(key, version)
+                if value is None:
+                    value = build()
+                    self.publish(key, version, value)
+        return value
@@ -0,0 +1,136 @@
+"""Local stand-in for the Google Sheets export endpoint.
+
+Serves ``/spreadsheets/d/<id>/export?format=csv&gid=<gid>`` from a directory
+of CSV or Parquet files, with an optional fixed delay per request, so the
+dashboard can be run and load-tested offline at repeatable latency::
+
+    python -m fcr.stub_server sample_data --port 8765 --latency 0.2
+    FCR_SOURCE=http://127.0.0.1:8765 streamlit run app.py
+
+``format=xlsx`` without a gid returns every file as one workbook, one tab
+per gid, for ``FCR_SOURCE=workbook:http://127.0.0.1:8765``.
+
+Responses carry an ETag, and a request whose ``If-None-Match`` still
+matches gets an empty 304, as from a conditional fetch. Connections are
+kept alive and bodies gzipped when the client accepts it.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import re
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from fcr.sources import LocalDirectorySource
+
+
+EXPORT_PATH = re.compile(r"^/spreadsheets/d/(?P<spreadsheet_id>[^/]+)/export$")
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def read_frame(export):
+    if export.format == "parquet":
+        return pd.read_parquet(io.BytesIO(export.content))
+    return pd.read_csv(io.BytesIO(export.content))
+
+
+def workbook(source, spreadsheet_id):
+    """Every export under ``source`` as one xlsx file, one tab per gid."""
+    gids = sorted({
+        path.stem
+        for folder in (source.root / spreadsheet_id, source.root)
+        for pattern in ("*.csv", "*.parquet")
+        for path in folder.glob(pattern)
+    })
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for gid in gids:
+            frame = read_frame(source.fetch(spreadsheet_id, gid))
+            frame.to_excel(writer, sheet_name=gid, index=False)
+    return buffer.getvalue()
+
+
+def make_handler(source, latency=0.0):
+
+    class ExportHandler(BaseHTTPRequestHandler):
+
+        # Keep-alive and gzip, as the Google endpoint does
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            match = EXPORT_PATH.match(url.path)
+            query = urllib.parse.parse_qs(url.query)
+            gid = query.get("gid", [None])[0]
+            fmt = query.get("format", ["csv"])[0]
+
+            if match is None or (gid is None and fmt != "xlsx"):
+                self.send_error(404)
+                return
+
+            if fmt == "xlsx":
+                body, content_type = workbook(source, match["spreadsheet_id"]), XLSX_TYPE
+            else:
+                try:
+                    export = source.fetch(match["spreadsheet_id"], gid)
+                except FileNotFoundError:
+                    self.send_error(404)
+                    return
+
+                body = export.content
+                if export.format == "parquet":
+                    body = read_frame(export).to_csv(index=False).encode()
+                content_type = "text/csv; charset=utf-8"
+
+            time.sleep(latency)
+
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            if gzipped:
+                body = gzip.compress(body, compresslevel=5)
+
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ExportHandler
+
+
+def serve(root, host="127.0.0.1", port=8765, latency=0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(LocalDirectorySource(root), latency))
+    print(f"Serving exports from {root} on http://{host}:{port}")
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="directory holding <gid>.csv / <gid>.parquet files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    args = parser.parse_args()
+
+    serve(args.root, args.host, args.port, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Canonical tehsil dimension shared by every sheet.
+
+The sheets spell the same tehsil in different ways ("ASR I", "asr-1",
+"Amritsar I", ...). At load time every tehsil value is resolved once to a
+canonical name and a small integer id, so pages filter and join on integer
+keys instead of comparing strings.
+
+Summary rows ("Total", "Grand Total") share the tehsil column on some
+tabs; ``drop_totals`` removes them before tehsils are resolved, so they are
+never mistaken for a tehsil.
+"""
+
+import logging
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+TEHSILS = (
+    "ASR I",
+    "Jandiala Guru",
+    "ASR II",
+    "Attari",
+    "Ajnala",
+    "Ramdass",
+    "Baba Bakala Sahib",
+    "Tarsikka",
+    "Beas",
+    "Lopoke",
+    "Rajasansi",
+    "Majitha",
+)
+
+# Other spellings seen for the canonical names, in normalized form
+ALIASES = {
+    "asr 1": "ASR I",
+    "amritsar i": "ASR I",
+    "amritsar 1": "ASR I",
+    "asr 2": "ASR II",
+    "amritsar ii": "ASR II",
+    "amritsar 2": "ASR II",
+    "jandiala": "Jandiala Guru",
+    "ramdas": "Ramdass",
+    "baba bakala": "Baba Bakala Sahib",
+}
+
+# Tehsil-column values that label a summary row, in normalized form
+_TOTAL = re.compile(r"^(grand |sub |district )?total\b")
+
+log = logging.getLogger(__name__)
+
+
+def normalize(name):
+    name = re.sub(r"[^0-9a-z]+", " ", str(name).casefold())
+    return " ".join(name.split())
+
+
+def is_total(name):
+    return _TOTAL.match(normalize(name)) is not None
+
+
+class TehsilDimension:
+    """Canonical tehsil names with stable integer ids.
+
+    Ids are positions in ``names``. Names not known in advance are added on
+    first sight, so existing ids never change while the process runs.
+    """
+
+    def __init__(self, names, aliases=None):
+        self.names = []
+        self._lookup = {}
+        self._lock = threading.Lock()
+
+        for name in names:
+            self._add(name)
+        for alias, name in (aliases or {}).items():
+            self._lookup[normalize(alias)] = self._lookup[normalize(name)]
+
+    def _add(self, name):
+        self._lookup[normalize(name)] = len(self.names)
+        self.names.append(name)
+        return self._lookup[normalize(name)]
+
+    def id_of(self, name):
+        key = normalize(name)
+        tid = self._lookup.get(key)
+        if tid is None:
+            with self._lock:
+                tid = self._lookup.get(key)
+                if tid is None:
+                    log.warning("Unknown tehsil %r added to the dimension", name)
+                    tid = self._add(" ".join(str(name).split()))
+        return tid
+
+    def ids_of(self, names):
+        return np.array([self.id_of(n) for n in names], dtype="int16")
+
+    def resolve(self, values):
+        """Map a Series of raw tehsil values to (canonical categorical, ids).
+
+        Each distinct spelling is looked up once; missing values get id -1.
+        """
+        raw = values.astype("category").cat.remove_unused_categories()
+        lookup = np.array(
+            [self.id_of(v) for v in raw.cat.categories] + [-1], dtype="int16"
+        )
+        ids = lookup[raw.cat.codes.to_numpy()]
+
+        # Categories are the whole dimension, so category codes == tehsil ids
+        names = pd.Categorical.from_codes(ids, categories=list(self.names))
+        return pd.Series(names, index=values.index), pd.Series(ids, index=values.index)
+
+    def table(self):
+        return pd.DataFrame({"tehsil_id": np.arange(len(self.names), dtype="int16"), "Tehsil": self.names})
+
+
+DIMENSION = TehsilDimension(TEHSILS, ALIASES)
+
+
+def options(df):
+    """Sorted canonical names of the tehsils that appear in ``df``."""
+    ids = np.unique(df["tehsil_id"].to_numpy())
+    return sorted(DIMENSION.names[i] for i in ids if i >= 0)
+
+
+def mask(df, names):
+    """Boolean row mask for ``names``, compared on integer ids."""
+    return np.isin(df["tehsil_id"].to_numpy(), DIMENSION.ids_of(names))
+
+
+def drop_totals(df, column="Tehsil"):
+    """Drop summary rows ("Total", "Grand Total", ...) from a sheet."""
+    values = df[column].astype("category")
+    totals = [c for c in values.cat.categories if is_total(c)]
+    if not totals:
+        return df
+    return df[~values.isin(totals).to_numpy()]
+
+
+def attach(df, column="Tehsil"):
+    """Replace ``column`` with canonical names and add an integer ``tehsil_id``."""
+    names, ids = DIMENSION.resolve(df[column])
+    return df.assign(**{column: names, "tehsil_id": ids})
+
+
+def adopt(df, column="Tehsil"):
+    """Reuse a frame cleaned by another process.
+
+    Its ids are kept when they agree with this process's dimension (new
+    names are registered in the same order), otherwise they are resolved
+    again.
+    """
+    if "tehsil_id" not in df.columns:
+        return df
+    categories = df[column].cat.categories
+    if np.array_equal(DIMENSION.ids_of(categories), np.arange(len(categories))):
+        return df
+    return attach(df, column)
@@ -1,7 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from fcr.data import load_cube, load_sheet, show_freshness
+from fcr.frames import select
+from fcr.tehsils import options as tehsil_options
+
 # ==============================
 # PAGE CONFIG (ONLY ONCE)
 # ==============================
@@ -17,39 +20,14 @@ st.markdown("---")
 # ==============================
 # LOAD DATA
 # ==============================
-@st.cache_data(ttl=300)
-def load_bhunaksha_data():
-    SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
-    GID = "741935264"  # Bhunaksha_Data
-
-    url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid={GID}"
-    df = pd.read_csv(url)
-
-    # Clean headers
-    df.columns = df.columns.str.strip()
-
-    # Date
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.dropna(subset=["Date"])
-
-    # Numeric columns (EXACT from sheet)
-    numeric_cols = [
-        "No. of Villages of which Shapefiles available with Districts",
-        "Total no. of villages where tatima incorporation work has been initiated",
-        "Total no. of Tatima to be incorporated",
-        "Total no. of Tatimas incorporated",
-        "Tatima incorporation Pending at Patwari level",
-        "No. of villages where Tatima work has been completed",
-        "No. of villages where Tatima Incorporation work initiated (uploaded by ASMs)"
-    ]
-
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    return df
+try:
+    df = load_sheet("bhunaksha")
+    cube = load_cube("bhunaksha")
+except RuntimeError as exc:
+    st.error(str(exc))
+    st.stop()
 
-
-df = load_bhunaksha_data()
+show_freshness("bhunaksha")
 
 # ==============================
 # SIDEBAR FILTERS
@@ -58,26 +36,19 @@ st.sidebar.header(" Filters")
 
 date_range = st.sidebar.date_input(
     "Date Range",
-    (df["Date"].min().date(), df["Date"].max().date())
+    (df["Date"].iloc[0].date(), df["Date"].iloc[-1].date())
 )
 
 tehsils = st.sidebar.multiselect(
     "Tehsil / Sub-Tehsil",
-    sorted(df["Name of Tehsil/Sub Tehsil"].unique())
+    tehsil_options(df)
 )
 
-filtered_df = df.copy()
-
-if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["Date"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["Date"] <= pd.to_datetime(date_range[1]))
-    ]
+# Filtered rows, and the same filters for the pre-aggregated cube
+filtered_df, selection = select(df, date_range, tehsils)
 
-if tehsils:
-    filtered_df = filtered_df[
-        filtered_df["Name of Tehsil/Sub Tehsil"].isin(tehsils)
-    ]
+# Sheet figures are daily snapshots: total each tehsil's latest day
+totals = cube.as_of_total(**selection)
 
 # ==============================
 # KPI SUMMARY (MEANINGFUL)
@@ -86,27 +57,27 @@ c1, c2, c3, c4, c5 = st.columns(5)
 
 c1.metric(
     "🗂️ Villages with Shapefiles",
-    int(filtered_df["No. of Villages of which Shapefiles available with Districts"].sum())
+    int(totals["No. of Villages of which Shapefiles available with Districts"])
 )
 
 c2.metric(
     "🚀 Tatima Initiated (Villages)",
-    int(filtered_df["Total no. of villages where tatima incorporation work has been initiated"].sum())
+    int(totals["Total no. of villages where tatima incorporation work has been initiated"])
 )
 
 c3.metric(
     "📌 Tatima Incorporated",
-    int(filtered_df["Total no. of Tatimas incorporated"].sum())
+    int(totals["Total no. of Tatimas incorporated"])
 )
 
 c4.metric(
     "⏳ Pending at Patwari",
-    int(filtered_df["Tatima incorporation Pending at Patwari level"].sum())
+    int(totals["Tatima incorporation Pending at Patwari level"])
 )
 
 c5.metric(
     "✅ Villages Completed",
-    int(filtered_df["No. of villages where Tatima work has been completed"].sum())
+    int(totals["No. of villages where Tatima work has been completed"])
 )
 
 st.markdown("---")
@@ -116,14 +87,12 @@ st.markdown("---")
 # ==============================
 st.subheader(" Tatima Progress Over Time")
 
-trend = (
-    filtered_df
-    .groupby("Date")[[
+trend = cube.by_date(
+    [
         "Total no. of Tatimas incorporated",
         "Tatima incorporation Pending at Patwari level"
-    ]]
-    .sum()
-    .reset_index()
+    ],
+    **selection
 )
 
 fig_trend = px.line(
@@ -143,24 +112,23 @@ st.plotly_chart(fig_trend, use_container_width=True)
 # ==============================
 st.subheader(" Tehsil-wise Tatima Status")
 
-bar = (
-    filtered_df
-    .groupby("Name of Tehsil/Sub Tehsil")[[
+bar = cube.as_of(
+    [
         "Total no. of Tatimas incorporated",
         "Tatima incorporation Pending at Patwari level"
-    ]]
-    .sum()
-    .reset_index()
+    ],
+    **selection
 )
 
 fig_bar = px.bar(
     bar,
-    x="Name of Tehsil/Sub Tehsil",
+    x="Tehsil",
     y=[
         "Total no. of Tatimas incorporated",
         "Tatima incorporation Pending at Patwari level"
     ],
-    barmode="group"
+    barmode="group",
+    labels={"Tehsil": "Name of Tehsil/Sub Tehsil"}
 )
 
 st.plotly_chart(fig_bar, use_container_width=True)
@@ -169,7 +137,7 @@ st.plotly_chart(fig_bar, use_container_width=True)
 # DATA TABLE
 # ==============================
 st.subheader("📋 Bhunaksha Detailed Data")
-st.dataframe(filtered_df, use_container_width=True)
+st.dataframe(filtered_df, use_container_width=True, column_config={"tehsil_id": None})
 
 st.markdown("---")
 st.caption("Bhunaksha (Tatima) Monitoring | FCR Dashboard")
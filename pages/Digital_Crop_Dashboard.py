@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from fcr.data import load_crop_daily, load_sheet, pick_as_of_day, show_freshness
+from fcr.frames import date_slice
+from fcr.tehsils import mask as tehsil_mask, options as tehsil_options
+
 # ==============================
 # PAGE CONFIG (ONLY ONCE)
 # ==============================
@@ -15,26 +19,20 @@ st.caption("Daily Digital Crop validation progress & pendency status")
 st.markdown("---")
 
 
-@st.cache_data(ttl=300)
-def load_crop_data():
-
-    SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
-    GID = "30899428"
-
-    url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid={GID}"
-
-    df = pd.read_csv(url)
-
-    df.columns = df.columns.str.strip()
-
-    return df
+# None for today; a past day is rebuilt from the sheet history
+as_of_day = pick_as_of_day()
 
+try:
+    df = load_sheet("crop", as_of_day)
+except (RuntimeError, LookupError) as exc:
+    st.error(str(exc))
+    st.stop()
 
-df = load_crop_data()
+if as_of_day is None:
+    show_freshness("crop")
+else:
+    st.caption(f"Digital Crop as it stood on {as_of_day:%d-%m-%Y}")
 
-df = df.rename(columns={
-    "Tehsil/Sub Tehsil":"Tehsil"
-})
 # ==================================
 # GLOBAL FILTERS
 # ==================================
@@ -42,7 +40,7 @@ df = df.rename(columns={
 st.sidebar.header("🔎 Filters")
 
 # Tehsil filter
-tehsil_list = sorted(df["Tehsil"].dropna().unique())
+tehsil_list = tehsil_options(df)
 
 selected_tehsil = st.sidebar.multiselect(
     "Select Tehsil",
@@ -50,40 +48,20 @@ selected_tehsil = st.sidebar.multiselect(
     default=tehsil_list
 )
 
-# Apply filter
-df = df[df["Tehsil"].isin(selected_tehsil)]
+# Apply filter (the cached frame is shared, so only narrow it when needed)
+if len(selected_tehsil) < len(tehsil_list):
+    df = df[tehsil_mask(df, selected_tehsil)]
 
-# Detect survey columns
-survey_cols = [c for c in df.columns if "Plots surveyed" in c]
-surveyor_cols = [c for c in df.columns if "Surveyors on field" in c]
+# Survey days are unpivoted once per export (see fcr.crop), and reach back
+# past the days the sheet still holds through the history
+daily = load_crop_daily(as_of_day)
 
-if len(survey_cols) == 0:
+if daily.empty:
     st.error("No 'Plots surveyed' columns found in Google Sheet.")
     st.stop()
 
-if len(surveyor_cols) == 0:
-    st.error("No 'Surveyors on field' columns found in Google Sheet.")
-    st.stop()
-
-latest_survey_col = survey_cols[-1]
-latest_surveyor_col = surveyor_cols[-1]
-
-# Create dashboard fields
-df["Daily Progress"] = df[latest_survey_col]
-
-df["Surveyors In Field"] = df[latest_surveyor_col]
-
-df["Survey Completion"] = (
-    df["Number of completed Plots till date"] /
-    df["Total number of uploaded plots"]
-) * 100
-
-df["Approval Rate"] = (
-    df["Performance  in %"]
-    .astype(str)
-    .str.replace("%","")
-    .astype(float)
-)
+# Dashboard fields (Survey Completion, Daily Progress, ...) are added at
+# load time, see fcr.crop.add_dashboard_fields
 
 total_target = df["Total number of uploaded plots"].sum()
 
@@ -97,24 +75,6 @@ survey_today = df["Daily Progress"].sum()
 surveyors = df["Number of Pvt. Surveyors identified"].sum()
 
 
-# Rename column for easier use
-
-
-
-df["Total Plots"] = df["Total number of uploaded plots"]
-
-df["Surveyed Plots"] = df["Number of completed Plots till date"]
-
-df["Surveyors"] = df["Number of Pvt. Surveyors identified"]
-
-df["In Field"] = df["Surveyors In Field"]
-
-df["Survey Progress"] = (
-    df["Surveyed Plots"] / df["Total Plots"]
-) * 100
-
-
-
 st.markdown("""
 <style>
 
@@ -503,20 +463,11 @@ st.plotly_chart(fig_progress, use_container_width=True)
 ##########################################################################################
 st.markdown("## 📊 Completion Trend Over Time (Tehsil-wise)")
 
-trend_df = df.melt(
-    id_vars=["Tehsil"],
-    value_vars=survey_cols,
-    var_name="Date",
-    value_name="Completed_Plots"
-)
-
-trend_df["Date"] = trend_df["Date"].str.replace("Plots surveyed on ", "")
-trend_df["Date"] = pd.to_datetime(trend_df["Date"], format="%d-%m-%Y")
+# Rows are sorted by date, so the slider bounds are the ends of the table
+trend_dates = daily["Date"].to_numpy()
 
-from datetime import datetime
-
-min_date = trend_df["Date"].min().to_pydatetime()
-max_date = trend_df["Date"].max().to_pydatetime()
+min_date = pd.Timestamp(trend_dates[0]).to_pydatetime()
+max_date = pd.Timestamp(trend_dates[-1]).to_pydatetime()
 
 date_range = st.slider(
     "Select Date Range",
@@ -526,22 +477,16 @@ date_range = st.slider(
     format="DD-MM-YYYY"
 )
 
-trend_df = trend_df[
-    (trend_df["Date"] >= pd.to_datetime(date_range[0])) &
-    (trend_df["Date"] <= pd.to_datetime(date_range[1]))
-]
-
-trend_df = trend_df[
-    (trend_df["Date"] >= date_range[0]) &
-    (trend_df["Date"] <= date_range[1])
-]
+trend_df = date_slice(daily, date_range[0], date_range[1])
+trend_df = trend_df[tehsil_mask(trend_df, selected_tehsil)]
 
 fig_trend = px.line(
     trend_df,
     x="Date",
-    y="Completed_Plots",
+    y="Plots Surveyed",
     color="Tehsil",
-    markers=True
+    markers=True,
+    labels={"Plots Surveyed": "Completed_Plots"}
 )
 
 fig_trend.update_layout(
@@ -560,7 +505,7 @@ status_df = df[[
     "Tehsil",
     "Number of completed Plots till date",
     "Pending for survey"
-]].copy()
+]]
 
 status_df = status_df.rename(columns={
     "Number of completed Plots till date": "Completed_Plots",
@@ -584,21 +529,13 @@ fig_status.update_layout(
 st.plotly_chart(fig_status, use_container_width=True)
 ###############################################################################################################################
 
-df["Number of Pvt. Surveyors identified"] = pd.to_numeric(
-    df["Number of Pvt. Surveyors identified"], errors="coerce"
-)
-
-df["Number of villages allocated"] = pd.to_numeric(
-    df["Number of villages allocated"], errors="coerce"
-)
-
 st.markdown("## 👥 Resource Deployment")
 
 resource_df = df[[
     "Tehsil",
     "Number of Pvt. Surveyors identified",
     "Number of villages allocated"
-]].copy()
+]]
 
 resource_df = resource_df.rename(columns={
     "Number of Pvt. Surveyors identified": "Surveyors Identified",
@@ -626,4 +563,4 @@ st.plotly_chart(fig_resource, use_container_width=True)
 
 st.subheader("Detailed Sub-Division Report")
 
-st.dataframe(df,use_container_width=True)
+st.dataframe(df,use_container_width=True,column_config={"tehsil_id": None})
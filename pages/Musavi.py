@@ -1,7 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
+from fcr.data import load_cube, load_sheet, show_freshness
+from fcr.frames import select
+from fcr.tehsils import options as tehsil_options
+
 # ==============================
 # PAGE CONFIG (ONLY ONCE)
 # ==============================
@@ -17,38 +20,14 @@ st.markdown("---")
 # ==============================
 # LOAD DATA
 # ==============================
-@st.cache_data(ttl=300)
-def load_musavi_data():
-    SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
-    GID = "1163442311"  # Musavi_Validation_Status
-
-    url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid={GID}"
-    df = pd.read_csv(url)
-
-    # Clean column names
-    df.columns = df.columns.str.strip()
-
-    # Date handling
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.dropna(subset=["Date"])
-
-    numeric_cols = [
-        "Total Villages",
-        "Maps Received",
-        "Maps Validated",
-        "Pending at Patwari",
-        "Pending at CRO",
-        "Pending at RPSC",
-        "Total CRO Validation Done"
-    ]
-
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+try:
+    df = load_sheet("musavi")
+    cube = load_cube("musavi")
+except RuntimeError as exc:
+    st.error(str(exc))
+    st.stop()
 
-    return df
-
-
-df = load_musavi_data()
+show_freshness("musavi")
 
 # ==============================
 # SIDEBAR FILTERS
@@ -57,38 +36,31 @@ st.sidebar.header("🔍 Filters")
 
 date_range = st.sidebar.date_input(
     "Date Range",
-    (df["Date"].min().date(), df["Date"].max().date())
+    (df["Date"].iloc[0].date(), df["Date"].iloc[-1].date())
 )
 
 tehsils = st.sidebar.multiselect(
     "Tehsil / Sub-Tehsil",
-    sorted(df["Tehsil / Sub-Tehsil"].unique())
+    tehsil_options(df)
 )
 
-filtered_df = df.copy()
-
-if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["Date"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["Date"] <= pd.to_datetime(date_range[1]))
-    ]
+# Filtered rows, and the same filters for the pre-aggregated cube
+filtered_df, selection = select(df, date_range, tehsils)
 
-if tehsils:
-    filtered_df = filtered_df[
-        filtered_df["Tehsil / Sub-Tehsil"].isin(tehsils)
-    ]
+# Sheet figures are daily snapshots: total each tehsil's latest day
+totals = cube.as_of_total(**selection)
 
 # ==============================
 # TOP SUMMARY KPIs (MEANINGFUL)
 # ==============================
-total_villages = int(filtered_df["Total Villages"].sum())
-maps_received = int(filtered_df["Maps Received"].sum())
-maps_validated = int(filtered_df["Maps Validated"].sum())
+total_villages = int(totals["Total Villages"])
+maps_received = int(totals["Maps Received"])
+maps_validated = int(totals["Maps Validated"])
 
 pending_total = int(
-    filtered_df["Pending at Patwari"].sum() +
-    filtered_df["Pending at CRO"].sum() +
-    filtered_df["Pending at RPSC"].sum()
+    totals["Pending at Patwari"] +
+    totals["Pending at CRO"] +
+    totals["Pending at RPSC"]
 )
 
 completion_pct = (
@@ -115,17 +87,17 @@ p1, p2, p3 = st.columns(3)
 
 p1.metric(
     "Patwari Pending",
-    int(filtered_df["Pending at Patwari"].sum())
+    int(totals["Pending at Patwari"])
 )
 
 p2.metric(
     "CRO Pending",
-    int(filtered_df["Pending at CRO"].sum())
+    int(totals["Pending at CRO"])
 )
 
 p3.metric(
     "RPSC Pending",
-    int(filtered_df["Pending at RPSC"].sum())
+    int(totals["Pending at RPSC"])
 )
 
 st.markdown("---")
@@ -135,18 +107,14 @@ st.markdown("---")
 # ==============================
 st.subheader("📍 Tehsil-wise Musavi Validation Status")
 
-bar_df = (
-    filtered_df
-    .groupby("Tehsil / Sub-Tehsil")[
-        ["Maps Validated", "Pending at Patwari", "Pending at CRO", "Pending at RPSC"]
-    ]
-    .sum()
-    .reset_index()
+bar_df = cube.as_of(
+    ["Maps Validated", "Pending at Patwari", "Pending at CRO", "Pending at RPSC"],
+    **selection
 )
 
 fig = px.bar(
     bar_df,
-    x="Tehsil / Sub-Tehsil",
+    x="Tehsil",
     y=[
         "Maps Validated",
         "Pending at Patwari",
@@ -154,7 +122,7 @@ fig = px.bar(
         "Pending at RPSC"
     ],
     barmode="stack",
-    labels={"value": "Number of Villages"}
+    labels={"value": "Number of Villages", "Tehsil": "Tehsil / Sub-Tehsil"}
 )
 
 st.plotly_chart(fig, use_container_width=True)
@@ -163,7 +131,7 @@ st.plotly_chart(fig, use_container_width=True)
 # DATA TABLE
 # ==============================
 st.subheader("📋 Detailed Musavi Validation Data")
-st.dataframe(filtered_df, use_container_width=True)
+st.dataframe(filtered_df, use_container_width=True, column_config={"tehsil_id": None})
 
 st.markdown("---")
 st.caption("Musavi Validation Status | FCR Dashboard")
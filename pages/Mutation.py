@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from fcr.data import load_cube, load_sheet, show_freshness
+from fcr.frames import select
+from fcr.tehsils import options as tehsil_options
+
 # ==============================
 # PAGE CONFIG (ONLY ONCE)
 # ==============================
@@ -17,40 +21,14 @@ st.markdown("---")
 # ==============================
 # LOAD DATA
 # ==============================
-@st.cache_data(ttl=300)
-def load_mutation_data():
-    SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
-    GID = "2073381520"  # Mutation_Pending_Status
-
-    url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid={GID}"
-    df = pd.read_csv(url)
-
-    # Clean column names
-    df.columns = df.columns.str.strip()
-
-    # Date handling
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.dropna(subset=["Date"])
-
-    # Numeric columns (EXACT from sheet)
-    numeric_cols = [
-        "Pendency at Patwari Level Beyond 15 days",
-        "Pendency at Patwari Level Beyond 30 days",
-        "Total",
-        "Pendency at Kanungo Level Beyond 20 days",
-        "Pendency at Kanungo Level Beyond 30 days",
-        "Total.1",
-        "Pendency at CRO Level Beyond 30 days",
-        "Grand Total of Mutation pendency beyond 30 days"
-    ]
-
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+try:
+    df = load_sheet("mutation")
+    cube = load_cube("mutation")
+except RuntimeError as exc:
+    st.error(str(exc))
+    st.stop()
 
-    return df
-
-
-df = load_mutation_data()
+show_freshness("mutation")
 
 # ==============================
 # SIDEBAR FILTERS
@@ -59,34 +37,28 @@ st.sidebar.header("🔍 Filters")
 
 date_range = st.sidebar.date_input(
     "Date Range",
-    (df["Date"].min().date(), df["Date"].max().date())
+    (df["Date"].iloc[0].date(), df["Date"].iloc[-1].date())
 )
 
 tehsils = st.sidebar.multiselect(
     "Tehsil",
-    sorted(df["Tehsil"].unique())
+    tehsil_options(df)
 )
 
-filtered_df = df.copy()
-
-if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["Date"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["Date"] <= pd.to_datetime(date_range[1]))
-    ]
-
-if tehsils:
-    filtered_df = filtered_df[filtered_df["Tehsil"].isin(tehsils)]
+# Filtered rows, and the same filters for the pre-aggregated cube
+filtered_df, selection = select(df, date_range, tehsils)
 # =================================
 # Separate dataframes properly
 # =================================
 
-# Keep full filtered data for trend & table
-trend_base_df = filtered_df.copy()
+# Pendency is a daily snapshot: KPIs and bars use each tehsil's latest day
+snapshot = cube.as_of(**selection)
 
-# Create latest-date dataframe for KPIs & bar charts
-latest_date = trend_base_df["Date"].max()
-latest_df = trend_base_df[trend_base_df["Date"] == latest_date]
+if snapshot.empty:
+    st.warning("No mutation data for the selected filters")
+    st.stop()
+
+latest = snapshot.drop(columns=["Tehsil", "Date"]).sum()
 
 # ==============================
 # KPI SUMMARY (MEANINGFUL)
@@ -95,22 +67,22 @@ c1, c2, c3, c4 = st.columns(4)
 
 c1.metric(
     "🧾 Patwari >30 Days",
-    latest_df["Pendency at Patwari Level Beyond 30 days"].sum()
+    int(latest["Pendency at Patwari Level Beyond 30 days"])
 )
 
 c2.metric(
     "🧾 Kanungo >30 Days",
-    filtered_df["Pendency at Kanungo Level Beyond 30 days"].sum()
+    int(latest["Pendency at Kanungo Level Beyond 30 days"])
 )
 
 c3.metric(
     "🧾 CRO >30 Days",
-    filtered_df["Pendency at CRO Level Beyond 30 days"].sum()
+    int(latest["Pendency at CRO Level Beyond 30 days"])
 )
 
 c4.metric(
     "🚨 Total Mutations >30 Days",
-    filtered_df["Grand Total of Mutation pendency beyond 30 days"].sum()
+    int(latest["Grand Total of Mutation pendency beyond 30 days"])
 )
 
 st.markdown("---")
@@ -123,9 +95,9 @@ st.subheader("📊 Level-wise Pendency (>30 Days)")
 level_df = pd.DataFrame({
     "Level": ["Patwari", "Kanungo", "CRO"],
     "Pending >30 Days": [
-        filtered_df["Pendency at Patwari Level Beyond 30 days"].sum(),
-        filtered_df["Pendency at Kanungo Level Beyond 30 days"].sum(),
-        filtered_df["Pendency at CRO Level Beyond 30 days"].sum()
+        int(latest["Pendency at Patwari Level Beyond 30 days"]),
+        int(latest["Pendency at Kanungo Level Beyond 30 days"]),
+        int(latest["Pendency at CRO Level Beyond 30 days"])
     ]
 })
 
@@ -146,21 +118,8 @@ st.markdown("---")
 # ==============================
 st.subheader("📍 Tehsil-wise Mutation Pendency (>30 Days)")
 
-tehsil_bar = (
-    latest_df
-    .groupby("Tehsil")[
-        [
-            "Pendency at Patwari Level Beyond 30 days",
-            "Pendency at Kanungo Level Beyond 30 days",
-            "Pendency at CRO Level Beyond 30 days"
-        ]
-    ]
-    .sum()
-    .reset_index()
-)
-
 fig_tehsil = px.bar(
-    tehsil_bar,
+    snapshot,
     x="Tehsil",
     y=[
         "Pendency at Patwari Level Beyond 30 days",
@@ -184,11 +143,9 @@ st.markdown("---")
 # ==============================
 st.subheader("📈 Trend: Mutation Pendency (>30 Days)")
 
-trend_df = (
-    trend_base_df
-    .groupby("Date")["Grand Total of Mutation pendency beyond 30 days"]
-    .sum()
-    .reset_index()
+trend_df = cube.by_date(
+    "Grand Total of Mutation pendency beyond 30 days",
+    **selection
 )
 
 fig_trend = px.line(
@@ -203,7 +160,7 @@ st.plotly_chart(fig_trend, use_container_width=True)
 # DATA TABLE
 # ==============================
 st.subheader("📋 Detailed Mutation Pending Data")
-st.dataframe(trend_base_df, use_container_width=True)
+st.dataframe(filtered_df, use_container_width=True, column_config={"tehsil_id": None})
 # ==============================
 # FOOTER
 # ==============================
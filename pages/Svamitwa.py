@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from fcr.data import load_cube, load_sheet, show_freshness
+from fcr.frames import select
+from fcr.tehsils import options as tehsil_options
+
 # ==============================
 # PAGE CONFIG
 # ==============================
@@ -13,38 +17,14 @@ st.markdown("---")
 # ==============================
 # LOAD DATA (UPDATED)
 # ==============================
-@st.cache_data(ttl=300)
-def load_svamitwa_data():
-    SPREADSHEET_ID = "135UDDzE8hCCSYn4WT1a6kED4lhL7mj6cDfms3PNGJPY"
-    GID = "1518724049"   # YOUR_SVAMITWA_GID
-
-    url = f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/export?format=csv&gid={GID}"
-    df = pd.read_csv(url)
-
-    # Clean headers (NO aggressive replace)
-    df.columns = df.columns.str.strip()
-
-    # Standardize Tehsil column
-    if "Name of Tehsil" in df.columns:
-        df = df.rename(columns={"Name of Tehsil": "Tehsil"})
-
-    # Remove total row
-    if "Tehsil" in df.columns:
-        df = df[df["Tehsil"].str.lower() != "total"]
-
-    # Date
-    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-    df = df.dropna(subset=["Date"])
-
-    # Convert numeric columns safely
-    for col in df.columns:
-        if col not in ["Date", "Tehsil", "Name of Tehsil sub parts"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    return df
-
+try:
+    df = load_sheet("svamitwa")
+    cube = load_cube("svamitwa")
+except RuntimeError as exc:
+    st.error(str(exc))
+    st.stop()
 
-df = load_svamitwa_data()
+show_freshness("svamitwa")
 
 if df.empty:
     st.error("No data loaded. Check Google Sheet.")
@@ -57,7 +37,7 @@ if df.empty:
 st.sidebar.header("🔎 Filters")
 
 # Tehsil filter
-tehsil_list = sorted(df["Tehsil"].dropna().unique())
+tehsil_list = tehsil_options(df)
 
 selected_tehsil = st.sidebar.multiselect(
     "Select Tehsil",
@@ -66,35 +46,29 @@ selected_tehsil = st.sidebar.multiselect(
 )
 
 # Date filter
-min_date = df["Date"].min().date()
-max_date = df["Date"].max().date()
+min_date = df["Date"].iloc[0].date()
+max_date = df["Date"].iloc[-1].date()
 
 date_range = st.sidebar.date_input(
     "Date Range",
     (min_date, max_date)
 )
 
-# Apply filter
-filtered_df = df.copy()
+# Filtered rows, and the same filters for the pre-aggregated cube (the
+# shared frame is only narrowed when a subset of tehsils is selected)
+filtered_df, selection = select(
+    df, date_range,
+    selected_tehsil if len(selected_tehsil) < len(tehsil_list) else None,
+)
 
-if selected_tehsil:
-    filtered_df = filtered_df[filtered_df["Tehsil"].isin(selected_tehsil)]
+# Sheet figures are daily snapshots: use each tehsil's latest day
+snapshot = cube.as_of(**selection)
 
-if len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["Date"] >= pd.to_datetime(date_range[0])) &
-        (filtered_df["Date"] <= pd.to_datetime(date_range[1]))
-    ]
-# ==============================
-# ✅ GET LATEST SNAPSHOT (FIX)
-# ==============================
+if snapshot.empty:
+    st.warning("No Svamitwa data for the selected filters")
+    st.stop()
 
-latest_df = (
-    filtered_df
-    .sort_values("Date")
-    .groupby("Tehsil")
-    .tail(1)
-)
+totals = snapshot.drop(columns=["Tehsil", "Date"]).sum()
 filtered_df = filtered_df.reset_index(drop=True)
 
 # ==============================
@@ -104,28 +78,24 @@ st.subheader("📊 Key Performance Summary")
 
 k1, k2, k3, k4 = st.columns(4)
 
-latest_date = filtered_df["Date"].max()
-
-latest_rows = filtered_df[filtered_df["Date"] == latest_date]
-
 k1.metric(
     "Total Villages Under Scheme",
-    int(latest_rows["Total No. of Villages under Scheme"].sum())
+    int(totals["Total No. of Villages under Scheme"])
 )
 
 k2.metric(
     "Villages Received",
-    int(filtered_df["Total No. of Villages Received by Dist. from SoI"].sum())
+    int(totals["Total No. of Villages Received by Dist. from SoI"])
 )
 
 k3.metric(
     "Ground Truth Completed",
-    int(filtered_df["Villages where ground truthing completed & sent back to SoI"].sum())
+    int(totals["Villages where ground truthing completed & sent back to SoI"])
 )
 
 k4.metric(
     "Map-1 Ground Truthing",
-    int(filtered_df["Map-1 Ground Truthing"].sum())
+    int(totals["Map-1 Ground Truthing"])
 )
 
 st.markdown("---")
@@ -135,12 +105,7 @@ st.markdown("---")
 # ==============================
 st.subheader("📍 Tehsil-wise Performance")
 
-tehsil_summary = (
-    filtered_df
-    .groupby("Tehsil")
-    .sum(numeric_only=True)
-    .reset_index()
-)
+tehsil_summary = snapshot
 
 fig_bar = px.bar(
     tehsil_summary,
@@ -161,12 +126,7 @@ st.plotly_chart(fig_bar, use_container_width=True)
 # ==============================
 st.subheader("📈 Daily Trend")
 
-trend = (
-    filtered_df
-    .groupby("Date")
-    .sum(numeric_only=True)
-    .reset_index()
-)
+trend = cube.by_date(**selection)
 
 fig_line = px.line(
     trend,
@@ -210,10 +170,8 @@ with c2:
 # ==============================
 st.subheader("📈 Daily Trend (Custom Range)")
 
-trend_df = filtered_df.copy()
-
-min_date = trend_df["Date"].min().date()
-max_date = trend_df["Date"].max().date()
+min_date = filtered_df["Date"].iloc[0].date()
+max_date = filtered_df["Date"].iloc[-1].date()
 
 trend_range = st.slider(
     "Select Date Range for Trend",
@@ -224,22 +182,17 @@ trend_range = st.slider(
     key="trend_slider"
 )
 
-trend_df = trend_df[
-    (trend_df["Date"] >= pd.to_datetime(trend_range[0])) &
-    (trend_df["Date"] <= pd.to_datetime(trend_range[1]))
-]
-
-trend = (
-    trend_df
-    .groupby("Date")
-    .sum(numeric_only=True)
-    .reset_index()
+trend = cube.by_date(
+    tehsils=selected_tehsil or None,
+    start=pd.to_datetime(trend_range[0]),
+    end=pd.to_datetime(trend_range[1])
 )
 
 # ✅ FIXED delta logic
 numeric_cols = trend.select_dtypes(include="number").columns
 
-delta = trend.copy()
+# trend is built fresh by the cube, so it can be changed in place
+delta = trend
 delta[numeric_cols] = delta[numeric_cols].diff().fillna(0)
 
 fig = px.bar(
@@ -261,7 +214,7 @@ st.plotly_chart(fig, use_container_width=True)
 # 📋 FULL DATA
 # ==============================
 st.subheader("📋 Detailed Data")
-st.dataframe(filtered_df, use_container_width=True)
+st.dataframe(filtered_df, use_container_width=True, column_config={"tehsil_id": None})
 
 st.markdown("---")
 st.caption("Svamitwa Monitoring System")
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fcr import history, schema, snapshots
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Snapshots and history of each test go to a directory of its own."""
+    monkeypatch.setattr(snapshots, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(history, "DB_PATH", tmp_path / "history.sqlite")
+    return tmp_path
+
+
+@pytest.fixture
+def daily():
+    """A daily sheet: three tehsils over ten days, one missing a day."""
+    rng = np.random.default_rng(0)
+    days = pd.date_range("2026-09-01", periods=10)
+    rows = [(d, t) for d in days for t in ("Ajnala", "Amritsar-I", "Baba Bakala")]
+    df = pd.DataFrame(rows, columns=["Date", "Tehsil"])
+    df["Pending"] = rng.integers(0, 50, len(df))
+    df["Disposed"] = rng.integers(0, 20, len(df)).astype(float)
+    return df.drop(index=4).reset_index(drop=True)
+
+
+@pytest.fixture
+def mutation_csv():
+    """A small export of the mutation sheet, as CSV bytes."""
+    rng = np.random.default_rng(1)
+    days = pd.date_range("2026-09-01", periods=3).strftime("%Y-%m-%d")
+    rows = [(d, t) for d in days for t in ("Ajnala", "Amritsar-I", "Baba Bakala")]
+    df = pd.DataFrame(rows, columns=["Date", "Tehsil"])
+    for column in schema.MUTATION.columns[2:]:
+        df[column.name] = rng.integers(0, 50, len(df))
+    return df.to_csv(index=False).encode()
@@ -0,0 +1,118 @@
+import pytest
+
+from fcr import breaker
+from fcr.breaker import CircuitBreaker, CircuitOpen
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker.time, "monotonic", clock)
+    return clock
+
+
+def ok():
+    return "ok"
+
+
+def fail():
+    raise ConnectionError("upstream down")
+
+
+def trip(b, times):
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            b.call(fail)
+
+
+def test_opens_after_threshold_failures(clock):
+    b = CircuitBreaker(threshold=3, cooldown=30)
+    trip(b, 2)
+    assert not b.is_open
+
+    trip(b, 1)
+    assert b.is_open
+    with pytest.raises(CircuitOpen):
+        b.call(ok)
+
+
+def test_success_resets_the_count(clock):
+    b = CircuitBreaker(threshold=3)
+    trip(b, 2)
+    assert b.call(ok) == "ok"
+    trip(b, 2)
+    assert not b.is_open
+
+
+def test_closes_after_a_successful_trial(clock):
+    b = CircuitBreaker(threshold=3, cooldown=30)
+    trip(b, 3)
+
+    clock.now += 31
+    assert not b.is_open
+    assert b.call(ok) == "ok"
+    assert b.call(ok) == "ok"
+
+
+def test_failed_trial_reopens_for_longer(clock):
+    b = CircuitBreaker(threshold=3, cooldown=30, max_cooldown=100)
+    trip(b, 3)
+
+    clock.now += 31
+    trip(b, 1)
+    assert b.is_open
+
+    clock.now += 31
+    with pytest.raises(CircuitOpen):   # now open for 60s
+        b.call(ok)
+
+    clock.now += 30
+    trip(b, 1)
+    clock.now += 99                    # 120s, capped at 100
+    with pytest.raises(CircuitOpen):
+        b.call(ok)
+    clock.now += 2
+    assert b.call(ok) == "ok"
+
+
+def test_one_trial_at_a_time(clock):
+    b = CircuitBreaker(threshold=1, cooldown=10)
+    trip(b, 1)
+    clock.now += 11
+
+    def nested():
+        # A second caller while the trial is still running
+        with pytest.raises(CircuitOpen):
+            b.call(ok)
+        return "ok"
+
+    assert b.call(nested) == "ok"
+    assert b.call(ok) == "ok"
+
+
+def test_errors_it_does_not_count_leave_it_closed(clock):
+    b = CircuitBreaker(threshold=2, is_failure=lambda exc: isinstance(exc, ConnectionError))
+
+    def missing():
+        raise LookupError("no such tab")
+
+    for _ in range(5):
+        with pytest.raises(LookupError):
+            b.call(missing)
+    assert not b.is_open
+
+    # Nor do they add up with real failures in between
+    trip(b, 1)
+    with pytest.raises(LookupError):
+        b.call(missing)
+    trip(b, 1)
+    assert not b.is_open
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from fcr import changes, kpi
+
+
+KPIS = (kpi.KPI("pending", "Pending", ("Pending",)), kpi.KPI("disposed", "Disposed", ("Disposed",)))
+
+
+@pytest.mark.parametrize("split", [3, 13, 27])
+def test_appended_matches_a_full_compare(daily, split):
+    old = daily.iloc[:split]
+    rows = daily.iloc[split:].copy()
+    rows.loc[rows.index[-1], "Tehsil"] = "Ajnala"   # one tehsil twice on a day
+
+    new = pd.concat([old, rows], ignore_index=True)
+    full = changes.compare("m", old, new, ["Pending", "Disposed"], date="Date", kpis=KPIS)
+    fast = changes.appended("m", old, new, "Date", kpis=KPIS)
+
+    pd.testing.assert_frame_equal(fast.new_rows, full.new_rows, check_dtype=False)
+    assert fast.removed_rows.empty and fast.cells.empty
+    pd.testing.assert_frame_equal(
+        fast.kpi_deltas.sort_values("Tehsil", ignore_index=True),
+        full.kpi_deltas.sort_values("Tehsil", ignore_index=True),
+        check_dtype=False,
+    )
+
+
+def test_appended_reads_far_back_for_a_quiet_tehsil():
+    # Beas last reported on the first of many days
+    days = pd.date_range("2026-01-01", periods=400)
+    old = pd.DataFrame({"Date": days, "Tehsil": "Ajnala", "Pending": 1, "Disposed": 0.0})
+    old.loc[0, ["Tehsil", "Pending"]] = ["Beas", 7]
+    rows = pd.DataFrame({"Date": [days[-1] + pd.Timedelta(days=1)], "Tehsil": ["Beas"],
+                         "Pending": [10], "Disposed": [0.0]})
+    new = pd.concat([old, rows], ignore_index=True)
+
+    feed = changes.appended("m", old, new, "Date", kpis=KPIS)
+    assert feed.kpi_deltas.set_index("Tehsil").loc["Beas", "Pending"] == 3
+    assert list(feed.kpi_deltas["Tehsil"]) == ["Beas"]
+
+
+def test_appended_feed_survives_json(daily):
+    feed = changes.appended("m", daily.iloc[:20], daily, "Date", kpis=KPIS, since=1.0, at=2.0)
+    again = changes.ChangeFeed.from_json(feed.to_json())
+
+    assert (again.since, again.at, len(again.new_rows)) == (1.0, 2.0, len(daily) - 20)
+    assert np.array_equal(again.new_rows["Tehsil"], feed.new_rows["Tehsil"])
+
+
+def test_compare_finds_edits_new_and_removed_rows(daily):
+    old = daily
+    new = daily.drop(index=0).copy()
+    new.loc[5, "Pending"] = 999
+    new.loc[7, "Disposed"] = np.nan
+    new = pd.concat([new, daily.iloc[[-1]].assign(Tehsil="Beas")], ignore_index=True)
+
+    feed = changes.compare("m", old, new, ["Pending", "Disposed"], date="Date", kpis=KPIS)
+
+    assert feed.new_rows.to_dict("records") == [{"Tehsil": "Beas", "Date": daily["Date"].iloc[-1]}]
+    assert feed.removed_rows.to_dict("records") == [{"Tehsil": "Ajnala", "Date": daily["Date"].iloc[0]}]
+    cells = feed.cells.set_index("Column")
+    assert cells.loc["Pending", ["Old", "New"]].tolist() == [str(daily.loc[5, "Pending"]), "999"]
+    assert cells.loc["Disposed", ["Old", "New"]].tolist() == [str(daily.loc[7, "Disposed"]), ""]
+    assert not feed.empty
+
+
+def test_compare_of_the_same_export_is_empty(daily):
+    feed = changes.compare("m", daily, daily.copy(), ["Pending", "Disposed"], date="Date", kpis=KPIS)
+    assert feed.empty and feed.kpi_deltas.empty
+
+
+def test_compare_numbers_repeated_keys(daily):
+    twice = pd.concat([daily, daily.iloc[[-1]]], ignore_index=True)
+    edited = twice.copy()
+    edited.loc[len(edited) - 1, "Pending"] = -1
+
+    feed = changes.compare("m", twice, edited, ["Pending"], date="Date")
+    assert len(feed.cells) == 1 and feed.cells["New"].tolist() == ["-1"]
+    assert feed.new_rows.empty and feed.removed_rows.empty
+
+
+def test_kpi_deltas_use_each_tehsils_latest_day(daily):
+    new = daily.copy()
+    last = new.index[new["Date"] == new["Date"].max()]
+    new.loc[last, "Pending"] += 5
+    new.loc[0, "Pending"] += 100   # an old day: not in the KPI
+
+    deltas = changes.compare("m", daily, new, ["Pending"], date="Date", kpis=KPIS).kpi_deltas
+    assert deltas.set_index("Tehsil")["Pending"].to_dict() == {
+        "Ajnala": 5, "Amritsar-I": 5, "Baba Bakala": 5
+    }
+
+
+def test_cells_are_text_for_arrow(daily):
+    new = daily.copy()
+    new.loc[1, "Pending"] = 1234
+    new["Note"] = "x"
+    old = daily.assign(Note="y")
+
+    cells = changes.compare("m", old, new, ["Pending", "Note"], date="Date").cells
+    pa.Table.from_pandas(cells)   # one type per column
+    assert all(isinstance(v, str) for v in pd.concat([cells["Old"], cells["New"]]))
@@ -0,0 +1,118 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from fcr import client, sources, stub_server
+
+
+def http_error(status):
+    resp = requests.Response()
+    resp.status_code = status
+    return requests.HTTPError(f"{status}", response=resp)
+
+
+@pytest.mark.parametrize("exc, outage", [
+    (http_error(503), True),
+    (http_error(429), True),
+    (http_error(404), False),
+    (http_error(403), False),
+    (requests.ConnectionError("refused"), True),
+    (requests.ReadTimeout("slow"), True),
+    (FileNotFoundError("no export"), False),
+    (LookupError("no tab"), False),
+])
+def test_is_outage(exc, outage):
+    assert client.is_outage(exc) is outage
+
+
+@pytest.fixture
+def stub(tmp_path, mutation_csv):
+    """The export stub server on a free port, counting connections."""
+    (tmp_path / "7.csv").write_bytes(mutation_csv)
+    handler = stub_server.make_handler(sources.LocalDirectorySource(tmp_path))
+    connections = []
+
+    class Counting(handler):
+        def setup(self):
+            connections.append(self.client_address)
+            super().setup()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Counting)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", connections
+    server.shutdown()
+    server.server_close()
+
+
+def test_exports_arrive_gzipped_over_one_connection(stub, mutation_csv):
+    url, connections = stub
+    http = client.Client()
+    source = sources.GoogleExportSource(url, client=http)
+
+    for _ in range(3):
+        export = source.fetch("sid", "7")
+        assert export.content == mutation_csv
+    resp = http.get(source.url("sid", "7"))
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert len(connections) == 1
+    http.close()
+
+
+def test_unchanged_export_comes_back_not_modified(stub):
+    url, _ = stub
+    source = sources.GoogleExportSource(url, client=client.Client())
+
+    first = source.fetch("sid", "7")
+    again = source.fetch("sid", "7", first.validators)
+    assert again.not_modified and again.content == b""
+
+
+def test_busy_upstream_is_retried():
+    answers = [503, 503, 200]
+
+    class Flaky(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = answers.pop(0)
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Flaky)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        resp = client.Client(retries=3, backoff=0.01).get(f"http://127.0.0.1:{server.server_port}/")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert resp.status_code == 200 and resp.content == b"ok"
+    assert answers == []
+
+
+def test_requests_in_flight_are_capped():
+    http = client.Client(max_connections=2)
+    inside, peak, lock = [0], [0], threading.Lock()
+
+    def get(url, headers=None, timeout=None):
+        with lock:
+            inside[0] += 1
+            peak[0] = max(peak[0], inside[0])
+        time.sleep(0.02)
+        with lock:
+            inside[0] -= 1
+        return requests.Response()
+
+    http.session.get = get
+    threads = [threading.Thread(target=http.get, args=("http://x",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
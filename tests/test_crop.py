@@ -0,0 +1,71 @@
+import pandas as pd
+
+from fcr import crop, tehsils
+
+
+def sheet(days=("01-09-2026", "02-09-2026")):
+    df = pd.DataFrame({
+        "Tehsil": ["Ajnala", "Beas"],
+        "Total number of uploaded plots": [100, 200],
+        "Number of completed Plots till date": [50, 20],
+        "Performance  in %": [90.0, 80.0],
+        "Number of Pvt. Surveyors identified": [3, 4],
+    })
+    for i, day in enumerate(days):
+        df[f"Plots surveyed on {day}"] = [10 * (i + 1), 1 * (i + 1)]
+        df[f"Surveyors on field {day}"] = [i + 1, i + 2]
+    return tehsils.attach(df)
+
+
+def test_day_columns_pair_each_day():
+    assert crop.day_columns(sheet().columns) == {
+        pd.Timestamp("2026-09-01"): ("Plots surveyed on 01-09-2026", "Surveyors on field 01-09-2026"),
+        pd.Timestamp("2026-09-02"): ("Plots surveyed on 02-09-2026", "Surveyors on field 02-09-2026"),
+    }
+
+
+def test_undated_surveyor_columns_align_on_the_latest_day():
+    columns = ["Plots surveyed on 01-09-2026", "Plots surveyed on 02-09-2026", "Surveyors on field"]
+    assert crop.day_columns(columns) == {
+        pd.Timestamp("2026-09-01"): ("Plots surveyed on 01-09-2026", None),
+        pd.Timestamp("2026-09-02"): ("Plots surveyed on 02-09-2026", "Surveyors on field"),
+    }
+
+
+def test_daily_facts_one_row_per_day_and_tehsil():
+    facts = crop.daily_facts(sheet())
+
+    assert list(facts.columns) == crop.FACT_COLUMNS
+    assert facts[["Tehsil", "Plots Surveyed", "Surveyors on Field"]].astype({"Tehsil": str}).values.tolist() == [
+        ["Ajnala", 10, 1], ["Beas", 1, 2], ["Ajnala", 20, 2], ["Beas", 2, 3],
+    ]
+    assert facts["Date"].is_monotonic_increasing
+
+
+def test_daily_facts_without_day_columns():
+    assert crop.daily_facts(sheet(days=())).empty
+
+
+def test_merge_facts_keeps_days_the_sheet_dropped():
+    older = crop.daily_facts(sheet())
+    newer = crop.daily_facts(sheet(days=("02-09-2026", "03-09-2026"))).assign(**{"Plots Surveyed": 7})
+
+    merged = crop.merge_facts(older, newer)
+    assert merged["Date"].dt.day.tolist() == [1, 1, 2, 2, 3, 3]
+    assert merged["Plots Surveyed"].tolist() == [10, 1, 7, 7, 7, 7]
+
+
+def test_dashboard_fields_use_the_latest_day():
+    df = crop.add_dashboard_fields(sheet())
+
+    assert df["Daily Progress"].tolist() == [20, 2]
+    assert df["Surveyors In Field"].tolist() == [2, 3]
+    assert df["Survey Completion"].tolist() == [50.0, 10.0]
+    assert set(crop.DASHBOARD_FIELDS) <= set(df.columns)
+
+
+def test_dashboard_fields_without_day_columns():
+    df = crop.add_dashboard_fields(sheet(days=()))
+
+    assert df["Daily Progress"].tolist() == [0, 0]
+    assert df["In Field"].tolist() == [0, 0]
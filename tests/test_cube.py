@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fcr.cube import Cube
+
+
+def assert_same(cube, expected):
+    assert cube.dates.equals(expected.dates)
+    assert cube.tehsils.equals(expected.tehsils)
+    assert cube.metrics.equals(expected.metrics)
+    np.testing.assert_array_equal(cube.values, expected.values)
+    np.testing.assert_array_equal(cube.counts, expected.counts)
+    np.testing.assert_allclose(cube._cum, expected._cum)
+    np.testing.assert_array_equal(cube._last, expected._last)
+
+
+@pytest.mark.parametrize("split", [3, 9, 13, 15, 28])
+def test_extend_equals_from_frame(daily, split):
+    # Splits at 13 and 28 fall part way through a day
+    head, tail = daily.iloc[:split], daily.iloc[split:]
+    cube = Cube.from_frame(head).extend(tail)
+    assert_same(cube, Cube.from_frame(daily))
+
+
+def test_extend_in_steps(daily):
+    cube = Cube.from_frame(daily.iloc[:3])
+    for start in range(3, len(daily), 4):
+        cube = cube.extend(daily.iloc[start:start + 4])
+    assert_same(cube, Cube.from_frame(daily))
+
+
+def test_extend_answers_queries(daily):
+    cube = Cube.from_frame(daily.iloc[:20]).extend(daily.iloc[20:])
+    full = Cube.from_frame(daily)
+    start, end = pd.Timestamp("2026-09-03"), pd.Timestamp("2026-09-08")
+
+    pd.testing.assert_frame_equal(cube.by_tehsil(start=start, end=end),
+                                  full.by_tehsil(start=start, end=end))
+    pd.testing.assert_frame_equal(cube.as_of(tehsils=["Ajnala"]), full.as_of(tehsils=["Ajnala"]))
+
+
+def test_extend_with_nothing_keeps_cube(daily):
+    cube = Cube.from_frame(daily)
+    assert cube.extend(daily.iloc[:0]) is cube
+
+
+def test_extend_refuses_earlier_days(daily):
+    late = daily[daily["Date"] >= "2026-09-05"]
+    early = daily[daily["Date"] < "2026-09-05"]
+    assert Cube.from_frame(late).extend(early) is None
+
+
+def test_extend_refuses_new_tehsils(daily):
+    tail = daily.iloc[-3:].assign(Tehsil="Beas")
+    assert Cube.from_frame(daily.iloc[:-3]).extend(tail) is None
+
+
+RANGES = [(None, None), ("2026-09-03", "2026-09-06"), ("2026-09-02", "2026-09-02"), ("2026-10-01", None)]
+SUBSETS = [None, ["Ajnala"], ["Baba Bakala", "Amritsar-I", "Nowhere"]]
+
+
+def rows_in(df, tehsils, start, end):
+    keep = pd.Series(True, index=df.index)
+    if tehsils is not None:
+        keep &= df["Tehsil"].isin(tehsils)
+    if start is not None:
+        keep &= df["Date"] >= start
+    if end is not None:
+        keep &= df["Date"] <= end
+    return df[keep]
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("tehsils", SUBSETS)
+def test_range_queries_match_a_groupby(daily, tehsils, start, end):
+    cube = Cube.from_frame(daily)
+    rows = rows_in(daily, tehsils, start, end)
+    metrics = ["Pending", "Disposed"]
+
+    by_tehsil = rows.groupby("Tehsil")[metrics].sum().reset_index()
+    got = cube.by_tehsil(tehsils=tehsils, start=start, end=end)   # in the order asked for
+    pd.testing.assert_frame_equal(
+        got.sort_values("Tehsil", ignore_index=True), by_tehsil, check_dtype=False
+    )
+
+    by_date = rows.groupby("Date")[metrics].sum().reset_index()
+    pd.testing.assert_frame_equal(
+        cube.by_date(tehsils=tehsils, start=start, end=end), by_date, check_dtype=False
+    )
+
+    total = cube.total(tehsils=tehsils, start=start, end=end)
+    assert total.tolist() == rows[metrics].sum().astype(float).tolist()
+    assert cube.last_date(tehsils, start, end) == (rows["Date"].max() if len(rows) else None)
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("tehsils", SUBSETS)
+def test_as_of_is_each_tehsils_latest_day(daily, tehsils, start, end):
+    # Baba Bakala skips the last day, so its latest day differs
+    df = daily[~((daily["Tehsil"] == "Baba Bakala") & (daily["Date"] == "2026-09-10"))]
+    cube = Cube.from_frame(df)
+    rows = rows_in(df, tehsils, start, end)
+
+    latest = rows[rows["Date"] == rows.groupby("Tehsil")["Date"].transform("max")]
+    expected = latest.groupby(["Tehsil", "Date"])[["Pending", "Disposed"]].sum().reset_index()
+
+    got = cube.as_of(tehsils=tehsils, start=start, end=end)
+    pd.testing.assert_frame_equal(
+        got.sort_values("Tehsil", ignore_index=True), expected, check_dtype=False
+    )
+    assert cube.as_of_total(["Pending"], tehsils, start, end)["Pending"] == expected["Pending"].sum()
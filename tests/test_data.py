@@ -0,0 +1,225 @@
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+import requests
+
+from fcr import breaker, data, history, ingest, snapshots, sources
+from fcr.cube import Cube
+from fcr.refresh import Refresher
+from fcr.store import Store
+
+
+class FakeClient:
+    """Answers export URLs from {gid: (status, body)}."""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    def get(self, url, headers=None):
+        gid = url.rsplit("gid=", 1)[1]
+        status, body = self.answers[gid]
+        if isinstance(status, Exception):
+            raise status
+        resp = requests.Response()
+        resp.status_code, resp._content, resp.url = status, body, url
+        return resp
+
+
+@pytest.fixture
+def fetching(monkeypatch):
+    """Point fcr.data at a fake upstream, with a breaker and state of its own."""
+    def use(answers):
+        monkeypatch.setattr(data, "source", sources.GoogleExportSource(client=FakeClient(answers)))
+    monkeypatch.setattr(data, "breaker", breaker.CircuitBreaker(
+        threshold=3, is_failure=data.http_client.is_outage
+    ))
+    monkeypatch.setattr(data, "_failures", {})
+    monkeypatch.setattr(data, "_meta", {})
+    monkeypatch.setattr(data, "store", Store())
+    return use
+
+
+MUTATION, MUSAVI = data.SHEET_GIDS["mutation"], data.SHEET_GIDS["musavi"]
+
+
+def test_one_bad_gid_does_not_stall_the_others(fetching, mutation_csv):
+    fetching({MUTATION: (200, mutation_csv), MUSAVI: (404, b"Not Found")})
+
+    for _ in range(5):
+        with pytest.raises(requests.HTTPError):
+            data.refresh_sheet(data.SPREADSHEET_ID, MUSAVI)
+        meta = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+        assert meta["rows"] == 9
+
+    assert not data.breaker.is_open
+    assert data.staleness("mutation") is None
+
+
+def test_missing_local_export_does_not_open_the_breaker(fetching, monkeypatch, tmp_path, mutation_csv):
+    folder = tmp_path / "exports"
+    folder.mkdir()
+    (folder / f"{MUTATION}.csv").write_bytes(mutation_csv)
+    monkeypatch.setattr(data, "source", sources.LocalDirectorySource(folder))
+
+    for _ in range(5):
+        with pytest.raises(FileNotFoundError):
+            data.refresh_sheet(data.SPREADSHEET_ID, MUSAVI)
+    assert not data.breaker.is_open
+    assert data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)["rows"] == 9
+
+
+def test_outage_opens_the_breaker_for_every_sheet(fetching, mutation_csv):
+    fetching({MUTATION: (200, mutation_csv), MUSAVI: (503, b"Unavailable")})
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            data.refresh_sheet(data.SPREADSHEET_ID, MUSAVI)
+
+    assert data.breaker.is_open
+    with pytest.raises(breaker.CircuitOpen):
+        data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+
+
+def test_connection_errors_count_as_outages(fetching, mutation_csv):
+    fetching({MUSAVI: (requests.ConnectionError("refused"), None)})
+    for _ in range(3):
+        with pytest.raises(requests.ConnectionError):
+            data.refresh_sheet(data.SPREADSHEET_ID, MUSAVI)
+    assert data.breaker.is_open
+
+
+def test_append_refresh_matches_a_full_read(fetching, mutation_csv):
+    head, tail = mutation_csv.rsplit(b"\n", 5)[0], mutation_csv
+    fetching({MUTATION: (200, head)})
+    first = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+    data.cube_by_gid(data.SPREADSHEET_ID, MUTATION, first["content_hash"])
+
+    fetching({MUTATION: (200, tail)})
+    # Past the window in which a fresh snapshot is reused as is
+    snapshots.touch(data.SPREADSHEET_ID, MUTATION, fetched_at=0)
+    meta = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+    assert len(meta["parts"]) == 1
+
+    df = data.load_sheet("mutation")
+    assert len(df) == 9
+    expected = data.clean(MUTATION, ingest.read(sources.Export(tail), data.SCHEMAS[MUTATION]))
+    pd.testing.assert_frame_equal(df, expected)
+
+    cube = data.store.get((data.SPREADSHEET_ID, MUTATION, "cube"), meta["content_hash"])
+    full = Cube.from_frame(expected)
+    assert cube is not None and (cube.values == full.values).all()
+
+    feed = data.load_changes("mutation")
+    assert len(feed.new_rows) == 4 and feed.cells.empty
+
+    recorded = history.as_of("mutation", date.today())
+    assert len(recorded) == 9
+
+
+def test_unreadable_snapshot_is_fetched_again(fetching, monkeypatch, cache_dir, mutation_csv):
+    fetching({MUTATION: (200, mutation_csv)})
+    meta = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+
+    # Another process starts with the sidecar but without the data files
+    monkeypatch.setattr(data, "store", Store())
+    for path in (cache_dir / data.SPREADSHEET_ID).glob(f"{MUTATION}.*"):
+        if path.suffix in (".parquet", ".arrow"):
+            path.unlink()
+
+    asked = []
+    monkeypatch.setattr(data.refresher, "run_soon", asked.append)
+    with pytest.raises(data.SheetUnavailable):
+        data.load_sheet_by_gid(data.SPREADSHEET_ID, MUTATION, meta["content_hash"])
+    assert asked == [(data.SPREADSHEET_ID, MUTATION)]
+
+    # The refresh finds the files gone and fetches the sheet in full
+    snapshots.touch(data.SPREADSHEET_ID, MUTATION, fetched_at=0)
+    meta = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+    assert len(data.load_sheet_by_gid(data.SPREADSHEET_ID, MUTATION, meta["content_hash"])) == 9
+
+
+def test_refresher_retries_failed_jobs_sooner():
+    calls = []
+
+    def job():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise ConnectionError("upstream down")
+
+    refresher = Refresher(interval=60, retry=0.05)
+    refresher.schedule("job", job, delay=0)
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) == 2
+    assert calls[1] - calls[0] < 1
+
+
+def test_unchanged_export_is_not_parsed_again(fetching, monkeypatch, mutation_csv):
+    fetching({MUTATION: (200, mutation_csv)})
+    first = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+
+    parsed = []
+    monkeypatch.setattr(data.ingest, "read", lambda *args: parsed.append(args))
+    snapshots.touch(data.SPREADSHEET_ID, MUTATION, fetched_at=0)
+    meta = data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+
+    assert not parsed
+    assert meta["content_hash"] == first["content_hash"]
+    assert meta["fetched_at"] > 0
+
+
+class SlowSource:
+    """Holds every fetch until ``release`` is set."""
+
+    def __init__(self, content):
+        self.content = content
+        self.release = threading.Event()
+
+    def fetch(self, spreadsheet_id, gid, validators=None):
+        self.release.wait(5)
+        return sources.Export(self.content)
+
+
+class IdleRefresher:
+    def schedule(self, key, job, delay=None):
+        pass
+
+    def run_soon(self, key):
+        pass
+
+
+def test_first_load_is_bounded_by_the_deadline(fetching, monkeypatch, mutation_csv):
+    slow = SlowSource(mutation_csv)
+    monkeypatch.setattr(data, "source", slow)
+    monkeypatch.setattr(data, "refresher", IdleRefresher())
+    monkeypatch.setattr(data, "_first_fetches", {})
+    monkeypatch.setattr(data, "LOAD_DEADLINE", 0.2)
+
+    started = time.monotonic()
+    with pytest.raises(data.SheetUnavailable, match="taking too long"):
+        data.load_sheet("mutation")
+    assert time.monotonic() - started < 1
+
+    # The fetch carries on in the background and later loads find it
+    slow.release.set()
+    data._first_fetches[(data.SPREADSHEET_ID, MUTATION)].result(timeout=5)
+    assert len(data.load_sheet("mutation")) == 9
+
+
+def test_staleness_after_failed_refreshes(fetching, mutation_csv):
+    fetching({MUTATION: (200, mutation_csv)})
+    data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+    assert data.staleness("mutation") is None
+
+    fetching({MUTATION: (requests.ConnectionError("down"), None)})
+    snapshots.touch(data.SPREADSHEET_ID, MUTATION, fetched_at=0)
+    with pytest.raises(requests.ConnectionError):
+        data.refresh_sheet(data.SPREADSHEET_ID, MUTATION)
+
+    assert data.staleness("mutation").endswith("retrying in the background")
+    # The last good frame is still served
+    assert len(data.load_sheet("mutation")) == 9
@@ -0,0 +1,57 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from fcr import frames, tehsils
+from fcr.cube import Cube
+
+
+@pytest.fixture
+def sheet(daily):
+    return frames.sort_by_date(tehsils.attach(daily.sample(frac=1, random_state=3)))
+
+
+def test_sort_by_date_then_tehsil(sheet):
+    assert sheet["Date"].is_monotonic_increasing
+    assert sheet.groupby("Date")["tehsil_id"].apply(lambda s: s.is_monotonic_increasing).all()
+    assert sheet.index.equals(pd.RangeIndex(len(sheet)))
+
+
+@pytest.mark.parametrize("start, end", [
+    (None, None),
+    ("2026-09-03", "2026-09-05"),
+    ("2026-08-01", "2026-09-01"),
+    ("2026-09-10", None),
+    (None, "2026-08-31"),
+    ("2026-09-06", "2026-09-04"),
+])
+def test_date_slice_matches_a_mask(sheet, start, end):
+    keep = pd.Series(True, index=sheet.index)
+    if start is not None:
+        keep &= sheet["Date"] >= start
+    if end is not None:
+        keep &= sheet["Date"] <= end
+    pd.testing.assert_frame_equal(frames.date_slice(sheet, start, end), sheet[keep])
+
+
+def test_select_filters_rows_and_names_the_cube_filters(sheet):
+    rows, selection = frames.select(sheet, (date(2026, 9, 2), date(2026, 9, 4)), ["Ajnala"])
+
+    assert rows["Date"].min() == pd.Timestamp("2026-09-02")
+    assert rows["Date"].max() == pd.Timestamp("2026-09-04")
+    assert set(rows["Tehsil"].astype(str)) == {"Ajnala"}
+    assert selection == dict(
+        tehsils=["Ajnala"], start=pd.Timestamp("2026-09-02"), end=pd.Timestamp("2026-09-04")
+    )
+
+    # The same filters give the same totals from the cube
+    cube = Cube.from_frame(sheet)
+    assert cube.total(["Pending"], **selection)["Pending"] == rows["Pending"].sum()
+
+
+def test_select_with_a_half_picked_range(sheet):
+    # The date input holds one date while the user picks the second
+    rows, selection = frames.select(sheet, (date(2026, 9, 2),))
+    assert len(rows) == len(sheet)
+    assert selection == dict(tehsils=None, start=None, end=None)
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from fcr import data, history
+
+
+KEYS = ["Date", "Tehsil"]
+DAY1, DAY2, DAY3 = date(2026, 9, 10), date(2026, 9, 11), date(2026, 9, 12)
+
+
+def rebuilt(sheet, day):
+    df = history.as_of(sheet, day)
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df.sort_values(KEYS, ignore_index=True)
+
+
+def same(df):
+    return df.sort_values(KEYS, ignore_index=True)
+
+
+@pytest.fixture
+def edits(daily):
+    """The sheet on three days: as is; one cell edited and a row dropped; rows added."""
+    second = daily.copy()
+    second.loc[2, "Pending"] = 999
+    second = second.drop(index=5).reset_index(drop=True)
+    extra = daily.iloc[-3:].assign(Date=pd.Timestamp("2026-09-11"))
+    third = pd.concat([second, extra], ignore_index=True)
+    return daily, second, third
+
+
+def test_as_of_rebuilds_each_day(edits):
+    for day, df in zip((DAY1, DAY2, DAY3), edits):
+        history.record("m", df, KEYS, day)
+
+    for day, df in zip((DAY1, DAY2, DAY3), edits):
+        pd.testing.assert_frame_equal(rebuilt("m", day), same(df), check_dtype=False)
+    assert history.as_of("m", date(2026, 9, 9)).empty
+
+
+def test_unchanged_rows_are_not_written_again(edits):
+    first, second, _ = edits
+    assert history.record("m", first, KEYS, DAY1) == len(first)
+    assert history.record("m", first, KEYS, DAY2) == 0
+    assert history.record("m", second, KEYS, DAY3) == 2   # one edit, one removal
+
+
+def test_same_day_keeps_the_last_state(edits):
+    first, second, _ = edits
+    history.record("m", first, KEYS, DAY1)
+    history.record("m", first, KEYS, DAY2)
+    history.record("m", second, KEYS, DAY2)
+
+    pd.testing.assert_frame_equal(rebuilt("m", DAY1), same(first), check_dtype=False)
+    pd.testing.assert_frame_equal(rebuilt("m", DAY2), same(second), check_dtype=False)
+
+
+def test_appended_rows_only(daily):
+    # The first record ends part way through a day, as an export can
+    head = daily.iloc[:-2]
+    history.record("m", head, KEYS, DAY1)
+    assert history.record("m", daily, KEYS, DAY2, start=len(head)) == 2
+
+    pd.testing.assert_frame_equal(rebuilt("m", DAY1), same(head), check_dtype=False)
+    pd.testing.assert_frame_equal(rebuilt("m", DAY2), same(daily), check_dtype=False)
+    # A full record of the same frame finds nothing left to store
+    assert history.record("m", daily, KEYS, DAY2) == 0
+
+
+def test_merged_keeps_dropped_rows(edits):
+    first, second, _ = edits
+    history.record("m", first, KEYS, DAY1)
+    history.record("m", second, KEYS, DAY2)
+
+    merged = history.merged("m")
+    assert len(merged) == len(first)
+    assert merged["Pending"].eq(999).sum() == 1
+    assert len(history.merged("m", until=DAY1)) == len(first)
+
+
+def test_first_day(daily):
+    assert history.first_day() is None
+
+    history.record("m", daily, KEYS, DAY2)
+    assert history.first_day() == DAY2
+
+    # Cached, and moved earlier by record
+    history.record("other", daily, KEYS, DAY1)
+    assert history.first_day() == DAY1
+
+
+def test_history_start_survives_a_broken_database(cache_dir):
+    history.DB_PATH.write_bytes(b"not a database" * 100)
+    assert data.history_start() is None
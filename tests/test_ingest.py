@@ -0,0 +1,77 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fcr import ingest, schema
+from fcr.sources import Export
+
+
+VILLAGES = schema.SheetSchema(
+    "villages",
+    (
+        schema.Column("Tehsil", schema.CATEGORY),
+        schema.Column("Plots", schema.COUNT, aliases=("Total Plots",)),
+        schema.Column("Done", schema.COUNT),
+        schema.Column("Village", schema.TEXT, required=False),
+    ),
+    date_column=None,
+    key=("Tehsil",),
+)
+
+ENGINES = ["pandas", "pyarrow"]
+
+
+def villages_csv(rows=50):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "Tehsil": rng.choice(["Ajnala", "Beas", "Majitha"], rows),
+        "Village": [f"V{i}" for i in range(rows)],
+        "Total Plots": rng.integers(0, 100, rows),
+        "Done": rng.integers(0, 50, rows),
+        "Remarks": "not needed",
+    })
+    return df, df.to_csv(index=False).encode()
+
+
+def test_header_numbers_repeated_names():
+    assert ingest.header(b"\xef\xbb\xbfA,Total,B,Total,Total\n1,2,3,4,5\n") == [
+        "A", "Total", "B", "Total.1", "Total.2"
+    ]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_only_schema_columns_are_read(engine, mutation_csv):
+    df = pd.read_csv(io.BytesIO(mutation_csv))
+    df.insert(2, "Remarks", "x")
+    content = df.to_csv(index=False).encode()
+
+    df = ingest.read(Export(content), schema.MUTATION, engine=engine)
+    assert list(df.columns) == schema.MUTATION.names
+    assert len(df) == 9
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_agree(engine, mutation_csv):
+    expected = pd.read_csv(io.BytesIO(mutation_csv))
+    df = ingest.read(Export(mutation_csv), schema.MUTATION, engine=engine)
+
+    pd.testing.assert_frame_equal(
+        schema.apply(df, schema.MUTATION), schema.apply(expected, schema.MUTATION)
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_keyed_tabs_roll_up_across_chunks(engine, monkeypatch):
+    # Chunks far smaller than the export, so partial sums must be merged
+    monkeypatch.setattr(ingest, "CHUNK_ROWS", 7)
+    monkeypatch.setattr(ingest, "BLOCK_SIZE", 256)
+    raw, content = villages_csv()
+
+    df = ingest.read(Export(content), VILLAGES, engine=engine)
+
+    expected = raw.groupby("Tehsil")[["Total Plots", "Done"]].sum()
+    got = df.set_index(df["Tehsil"].astype(str))[["Plots", "Done"]].sort_index()
+    assert got.to_numpy().tolist() == expected.to_numpy().tolist()
+    assert "Village" not in df.columns and "Remarks" not in df.columns
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from fcr import kpi, schema, tehsils
+
+
+KPIS = (
+    kpi.KPI("a", "A", ("x",)),
+    kpi.KPI("pending", "Pending", ("x", "y")),
+)
+
+
+def sheet():
+    return tehsils.attach(pd.DataFrame({
+        "Tehsil": ["Ajnala", "Beas", "Beas", "Majitha"],
+        "x": [1, 2, 3, 4],
+        "y": [10.0, 20.0, 30.0, 40.5],
+    }))
+
+
+def test_compute_sums_each_kpi_once():
+    result = kpi.compute("m", sheet(), KPIS)
+    assert (result["a"], result["pending"]) == (10, 110)
+    assert result.items() == [("A", 10), ("Pending", 110)]
+
+
+def test_compute_for_some_tehsils():
+    result = kpi.compute("m", sheet(), KPIS, tehsils=["Beas", "Ajnala"])
+    assert (result["a"], result["pending"]) == (6, 66)
+    assert kpi.compute("m", sheet(), KPIS, tehsils=[])["a"] == 0
+
+
+def test_compute_matches_a_groupby():
+    df = sheet()
+    expected = df.groupby("Tehsil", observed=True)[["x", "y"]].sum().loc[["Beas"]].sum()
+    result = kpi.compute("m", df, KPIS, tehsils=["Beas"])
+    assert result["pending"] == int(expected.sum())
+
+
+def test_total_pendency_adds_the_pending_kpis():
+    results = kpi.compute_all(
+        {"m1": sheet(), "m2": sheet(), "m3": sheet()},
+        definitions={"m1": KPIS, "m2": KPIS, "m3": KPIS[:1]},
+    )
+    assert kpi.total_pendency(results) == 220
+
+
+def test_home_kpis_name_the_sheet_columns():
+    for name, kpis in kpi.HOME_KPIS.items():
+        columns = {c.name for c in schema.SCHEMAS[name].columns}
+        assert {c for k in kpis for c in k.columns} <= columns, name
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from fcr import data, ranking, tehsils
+from fcr.cube import Cube
+
+
+def daily(columns, rows):
+    """A cube from (date, tehsil, value) rows, the value spread over ``columns``."""
+    df = pd.DataFrame(rows, columns=["Date", "Tehsil", "value"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    for i, column in enumerate(columns):
+        df[column] = df["value"] if i == 0 else 0
+    return Cube.from_frame(df.drop(columns="value"))
+
+
+@pytest.fixture
+def built():
+    # Latest day only counts: Ajnala's 99 on the first day is superseded
+    cubes = {
+        "mutation": daily(ranking.PENDENCY["mutation"], [
+            ("2026-09-01", "Ajnala", 99), ("2026-09-02", "Ajnala", 20), ("2026-09-01", "Beas", 5),
+        ]),
+        "musavi": daily(ranking.PENDENCY["musavi"], [
+            ("2026-09-02", "Ajnala", 0), ("2026-09-02", "Beas", 10),
+        ]),
+        "bhunaksha": daily(ranking.PENDENCY["bhunaksha"], [
+            ("2026-09-02", "Ajnala", 1), ("2026-09-02", "Beas", 1),
+        ]),
+    }
+    crop = tehsils.attach(pd.DataFrame({
+        "Tehsil": ["Ajnala", "Ajnala", "Beas"],
+        "Pending for survey": [10, 20, 10],
+    }))
+    return ranking.build(cubes, crop)
+
+
+def test_scores_are_mean_shares(built):
+    table = built.table.set_index("Tehsil")
+    # Shares: mutation .8/.2, musavi 0/1, bhunaksha .5/.5, crop .75/.25
+    assert table.loc["Ajnala", "Score"] == pytest.approx(51.25)
+    assert table.loc["Beas", "Score"] == pytest.approx(48.75)
+    assert table.loc["Ajnala", "Total"] == 20 + 0 + 1 + 30
+
+
+def test_top_and_bottom(built):
+    assert built.top(1)["Tehsil"].tolist() == ["Ajnala"]
+    assert built.bottom(1)["Tehsil"].tolist() == ["Beas"]
+    # Only tehsils seen in some sheet are ranked
+    assert built.top(10)["Tehsil"].tolist() == ["Ajnala", "Beas"]
+
+
+def test_selection_within_tehsils(built):
+    assert built.top(3, tehsils=["Beas", "Majitha"])["Tehsil"].tolist() == ["Beas"]
+    assert built.bottom(3, tehsils=["Majitha"]).empty
+
+
+def test_ranking_builds_only_the_cubes_it_scores(monkeypatch):
+    asked = []
+    monkeypatch.setattr(data, "load_cube", lambda name, day=None: asked.append(name))
+    monkeypatch.setattr(data, "load_sheet", lambda name, day=None: None)
+    monkeypatch.setattr(ranking, "build", lambda cubes, crop: sorted(cubes))
+    data._ranking.clear()
+
+    assert data._ranking(("test",)) == sorted(asked) == ["bhunaksha", "musavi", "mutation"]
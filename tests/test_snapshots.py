@@ -0,0 +1,157 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from fcr import snapshots
+
+
+SID, GID = "sheet", "123"
+
+
+def test_reload_matches_saved_frame(daily):
+    snapshots.save(SID, GID, daily, "h1", fetched_at=5.0, size=100)
+
+    snapshot = snapshots.load(SID, GID)
+    assert (snapshot.content_hash, snapshot.fetched_at) == ("h1", 5.0)
+    pd.testing.assert_frame_equal(snapshot.frame, daily)
+
+    meta = snapshots.read_meta(SID, GID)
+    assert (meta["rows"], meta["bytes"]) == (len(daily), 100)
+
+
+def test_missing_snapshot_loads_as_none(cache_dir, daily):
+    assert snapshots.load(SID, GID) is None
+    assert snapshots.read_meta(SID, GID) is None
+
+    snapshots.save(SID, GID, daily, "h1")
+    (cache_dir / SID / f"{GID}.json").write_text("{not json")
+    assert snapshots.load(SID, GID) is None
+
+
+def test_reload_joins_appended_parts(daily):
+    snapshots.save(SID, GID, daily.iloc[:10], "h1", size=100)
+    snapshots.append(SID, GID, daily.iloc[10:20], "h2", size=200)
+    snapshots.append(SID, GID, daily.iloc[20:], "h3", size=300)
+
+    meta = snapshots.read_meta(SID, GID)
+    assert (meta["rows"], meta["bytes"], len(meta["parts"])) == (len(daily), 300, 2)
+
+    snapshot = snapshots.load(SID, GID)
+    assert snapshot.content_hash == "h3"
+    pd.testing.assert_frame_equal(snapshot.frame, daily)
+
+
+def test_save_drops_older_generations(cache_dir, daily):
+    snapshots.save(SID, GID, daily.iloc[:10], "h1")
+    snapshots.append(SID, GID, daily.iloc[10:], "h2", size=200)
+    snapshots.save(SID, GID, daily.iloc[:5], "h3")
+
+    assert sorted(p.name for p in (cache_dir / SID).glob("*.parquet")) == [f"{GID}.g2.parquet"]
+    pd.testing.assert_frame_equal(snapshots.load(SID, GID).frame, daily.iloc[:5])
+
+
+def test_interrupted_save_keeps_the_old_snapshot(monkeypatch, daily):
+    snapshots.save(SID, GID, daily, "h1")
+
+    def crash(meta_path, meta):
+        raise OSError("disk full")
+    monkeypatch.setattr(snapshots, "_write_meta", crash)
+    with pytest.raises(OSError):
+        snapshots.save(SID, GID, daily.iloc[:5], "h2")
+
+    snapshot = snapshots.load(SID, GID)
+    assert snapshot.content_hash == "h1"
+    pd.testing.assert_frame_equal(snapshot.frame, daily)
+
+
+def test_parts_of_another_generation_are_refused(cache_dir, daily):
+    snapshots.save(SID, GID, daily, "h1")
+    snapshots.append(SID, GID, daily, "h2", size=200)
+
+    meta_path = cache_dir / SID / f"{GID}.json"
+    meta = json.loads(meta_path.read_text())
+    meta["generation"] += 1
+    meta_path.write_text(json.dumps(meta))
+
+    assert snapshots.load(SID, GID) is None
+
+
+def test_sidecar_without_generation_still_loads(cache_dir, daily):
+    # Written before generations existed: <gid>.parquet, no base or generation
+    folder = cache_dir / SID
+    folder.mkdir()
+    daily.to_parquet(folder / f"{GID}.parquet", index=False)
+    (folder / f"{GID}.json").write_text(json.dumps(
+        {"gid": GID, "fetched_at": 1.0, "content_hash": "h0", "rows": len(daily), "parts": []}
+    ))
+
+    pd.testing.assert_frame_equal(snapshots.load(SID, GID).frame, daily)
+
+
+def test_fetch_lock_is_exclusive():
+    inside, overlaps = [], []
+
+    def fetch():
+        with snapshots.fetch_lock(SID, GID):
+            if inside:
+                overlaps.append(True)
+            inside.append(True)
+            time.sleep(0.01)
+            inside.pop()
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not overlaps
+
+
+def test_fetch_lock_is_exclusive_across_processes(cache_dir):
+    script = (
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "from fcr import snapshots\n"
+        "snapshots.CACHE_DIR = Path(sys.argv[1])\n"
+        "with snapshots.fetch_lock('sheet', '123'):\n"
+        "    print('locked', flush=True)\n"
+        "    time.sleep(0.5)\n"
+    )
+    child = subprocess.Popen([sys.executable, "-c", script, str(cache_dir)],
+                             cwd=Path(__file__).parent.parent, stdout=subprocess.PIPE, text=True)
+    assert child.stdout.readline().strip() == "locked"
+
+    started = time.monotonic()
+    with snapshots.fetch_lock(SID, GID):
+        waited = time.monotonic() - started
+    child.wait()
+    assert waited > 0.2
+
+
+def test_mapped_table_matches_frame(daily):
+    frame = daily.assign(Tehsil=daily["Tehsil"].astype("category"))
+    snapshots.save_table(SID, GID, frame, "h1")
+
+    pd.testing.assert_frame_equal(snapshots.map_table(SID, GID, "h1"), frame)
+
+
+def test_mapped_table_of_another_export_is_ignored(daily):
+    assert snapshots.map_table(SID, GID, "h1") is None
+
+    snapshots.save_table(SID, GID, daily, "h1")
+    assert snapshots.map_table(SID, GID, "h2") is None
+
+
+def test_touch_keeps_the_export(daily):
+    snapshots.save(SID, GID, daily, "h1", fetched_at=1.0, validators={"etag": '"a"'})
+    snapshots.touch(SID, GID, fetched_at=2.0)
+
+    meta = snapshots.read_meta(SID, GID)
+    assert (meta["fetched_at"], meta["content_hash"], meta["validators"]) == (2.0, "h1", {"etag": '"a"'})
+    pd.testing.assert_frame_equal(snapshots.load(SID, GID).frame, daily)
@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+import requests
+
+from fcr import schema, sources
+
+
+class RecordingClient:
+    """Answers every GET with ``status``/``body``/``headers`` and keeps the requests."""
+
+    def __init__(self, status=200, body=b"", headers=None):
+        self.status, self.body, self.headers = status, body, headers or {}
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, headers or {}))
+        resp = requests.Response()
+        resp.status_code, resp._content, resp.url = self.status, self.body, url
+        resp.headers.update(self.headers)
+        return resp
+
+
+def test_google_export_keeps_validators():
+    client = RecordingClient(body=b"a,b\n1,2\n", headers={"ETag": '"v1"', "Last-Modified": "Mon"})
+    export = sources.GoogleExportSource("http://stub", client=client).fetch("sid", "7")
+
+    assert export.content == b"a,b\n1,2\n" and not export.not_modified
+    assert export.validators == {"etag": '"v1"', "last_modified": "Mon"}
+    assert client.requests == [("http://stub/spreadsheets/d/sid/export?format=csv&gid=7", {})]
+
+
+def test_google_export_not_modified():
+    client = RecordingClient(status=304)
+    validators = {"etag": '"v1"', "last_modified": "Mon"}
+    export = sources.GoogleExportSource("http://stub", client=client).fetch("sid", "7", validators)
+
+    assert export.not_modified and export.content == b""
+    assert export.validators == validators
+    assert client.requests[0][1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+
+
+def test_local_export_not_modified_until_the_file_changes(tmp_path):
+    (tmp_path / "7.csv").write_bytes(b"a\n1\n")
+    source = sources.LocalDirectorySource(tmp_path)
+
+    first = source.fetch("sid", "7")
+    assert source.fetch("sid", "7", first.validators).not_modified
+
+    (tmp_path / "7.csv").write_bytes(b"a\n1\n2\n")
+    again = source.fetch("sid", "7", first.validators)
+    assert not again.not_modified and again.content == b"a\n1\n2\n"
+
+
+SMALL = schema.SheetSchema("small", (schema.Column("Tehsil", schema.CATEGORY), schema.Column("x", schema.COUNT)))
+LARGE = schema.SheetSchema("large", SMALL.columns + (
+    schema.Column("y", schema.COUNT),
+    schema.Column("Share", schema.PERCENT),
+))
+
+
+def workbook(path, tabs):
+    with pd.ExcelWriter(path) as book:
+        for name, frame in tabs.items():
+            frame.to_excel(book, sheet_name=name, index=False)
+    return path
+
+
+def test_workbook_tabs_match_gids_by_columns(tmp_path):
+    path = workbook(tmp_path / "book.xlsx", {
+        "Notes": pd.DataFrame({"Remark": ["hello"]}),
+        "Wide": pd.DataFrame({" Tehsil ": ["Beas"], "x": [1], "y": [2], "Share": [0.25]}),
+        "Narrow": pd.DataFrame({"Tehsil": ["Ajnala"], "x": [5]}),
+    })
+    source = sources.WorkbookSource(path, {"1": SMALL, "2": LARGE})
+
+    small, large = source.fetch("sid", "1"), source.fetch("sid", "2")
+    assert small.format == "frame" and small.frame["Tehsil"].tolist() == ["Ajnala"]
+    # The tab fitting the most columns wins, with percent fractions as 0-100
+    assert large.frame.to_dict("records") == [{"Tehsil": "Beas", "x": 1, "y": 2, "Share": 25.0}]
+
+
+def test_workbook_is_downloaded_once_for_every_sheet(tmp_path, monkeypatch):
+    path = workbook(tmp_path / "book.xlsx", {"Narrow": pd.DataFrame({"Tehsil": ["Ajnala"], "x": [5]})})
+    source = sources.WorkbookSource(path, {"1": SMALL, "2": LARGE}, max_age=60)
+
+    downloads = []
+    download = source.download
+    monkeypatch.setattr(source, "download", lambda sid: downloads.append(sid) or download(sid))
+
+    first = source.fetch("sid", "1")
+    assert source.fetch("sid", "1").content == first.content
+    with pytest.raises(LookupError):
+        source.fetch("sid", "2")
+    assert downloads == ["sid"]
+
+
+def test_workbook_tab_digest_follows_content(tmp_path):
+    tabs = {"Narrow": pd.DataFrame({"Tehsil": ["Ajnala"], "x": [5]})}
+    one = sources.WorkbookSource(workbook(tmp_path / "a.xlsx", tabs), {"1": SMALL}).fetch("sid", "1")
+    same = sources.WorkbookSource(workbook(tmp_path / "b.xlsx", tabs), {"1": SMALL}).fetch("sid", "1")
+    tabs["Narrow"].loc[0, "x"] = 6
+    other = sources.WorkbookSource(workbook(tmp_path / "c.xlsx", tabs), {"1": SMALL}).fetch("sid", "1")
+
+    assert one.content == same.content != other.content
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fcr import data, ingest, sources, tehsils
+from fcr.tehsils import DIMENSION, TEHSILS, TehsilDimension
+
+
+@pytest.mark.parametrize("spelling, name", [
+    ("ASR I", "ASR I"),
+    ("asr-1", "ASR I"),
+    ("Amritsar  I", "ASR I"),
+    ("AMRITSAR-II", "ASR II"),
+    (" jandiala ", "Jandiala Guru"),
+    ("Baba Bakala", "Baba Bakala Sahib"),
+    ("Ramdas", "Ramdass"),
+])
+def test_spellings_resolve_to_one_tehsil(spelling, name):
+    assert DIMENSION.names[DIMENSION.id_of(spelling)] == name
+
+
+def test_canonical_ids_are_positions():
+    assert [DIMENSION.id_of(n) for n in TEHSILS] == list(range(len(TEHSILS)))
+
+
+def test_unknown_names_get_new_ids_once():
+    dimension = TehsilDimension(["Ajnala"])
+    first = dimension.id_of("New  Tehsil")
+    assert first == 1 and dimension.id_of("new tehsil") == 1
+    assert dimension.names == ["Ajnala", "New Tehsil"]
+
+
+@pytest.mark.parametrize("value, total", [
+    ("Total", True),
+    ("Grand Total", True),
+    ("grand-total", True),
+    ("District Total ", True),
+    ("Sub Total", True),
+    ("Totalpur", False),
+    ("Ajnala", False),
+])
+def test_is_total(value, total):
+    assert tehsils.is_total(value) is total
+
+
+def test_drop_totals_keeps_the_tehsil_rows():
+    df = pd.DataFrame({"Tehsil": ["Ajnala", "Total", "Beas", "Grand Total"], "x": [1, 2, 3, 4]})
+    assert tehsils.drop_totals(df)["Tehsil"].tolist() == ["Ajnala", "Beas"]
+
+    clean = df.iloc[[0, 2]]
+    assert tehsils.drop_totals(clean) is clean
+
+
+def test_attach_adds_canonical_names_and_ids():
+    df = pd.DataFrame({"Tehsil": ["asr-1", "Beas", None, "ASR I"]})
+    out = tehsils.attach(df)
+
+    assert out["tehsil_id"].tolist() == [0, 8, -1, 0]
+    assert out["Tehsil"].tolist()[:2] == ["ASR I", "Beas"] and pd.isna(out["Tehsil"][2])
+    assert list(out["Tehsil"].cat.categories) == DIMENSION.names
+
+
+def test_mask_and_options_use_ids():
+    df = tehsils.attach(pd.DataFrame({"Tehsil": ["Beas", "asr 1", "Ajnala", "Beas"]}))
+
+    assert tehsils.mask(df, ["ASR I", "Beas"]).tolist() == [True, True, False, True]
+    assert tehsils.options(df) == ["ASR I", "Ajnala", "Beas"]
+
+
+def test_adopt_keeps_matching_ids():
+    df = tehsils.attach(pd.DataFrame({"Tehsil": ["Beas", "Ajnala"]}))
+    assert tehsils.adopt(df) is df
+
+    # Cleaned by a process whose dimension ordered the names differently
+    other = df.assign(
+        Tehsil=pd.Categorical(["Beas", "Ajnala"], categories=["Beas", "Ajnala"]),
+        tehsil_id=np.array([0, 1], dtype="int16"),
+    )
+    assert tehsils.adopt(other)["tehsil_id"].tolist() == [8, 4]
+
+
+def test_cleaning_drops_total_rows(mutation_csv):
+    gid = data.SHEET_GIDS["mutation"]
+    totals = b"2026-09-03,Total,1,1,1,1,1,1,1,1\n2026-09-03,GRAND TOTAL,2,2,2,2,2,2,2,2\n"
+    raw = ingest.read(sources.Export(mutation_csv + totals), data.SCHEMAS[gid])
+    size = len(DIMENSION.names)
+
+    df = data.clean(gid, raw)
+    assert len(df) == 9 and (df["tehsil_id"] >= 0).all()
+    assert len(DIMENSION.names) == size